@@ -1 +1,2 @@
 from .earning_yield import EarningYield
+from .watermark import AnalyticWatermark
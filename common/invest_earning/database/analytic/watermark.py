@@ -0,0 +1,18 @@
+"""Marca d'água das análises."""
+
+from invest_earning.database.base import AnalyticBase
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.types import BigInteger
+
+
+class AnalyticWatermark(AnalyticBase):
+    __tablename__ = "analytic_watermark"
+
+    processor: Mapped[str] = mapped_column(
+        primary_key=True, comment="Identificador do processador."
+    )
+    wallet_version = mapped_column(
+        BigInteger,
+        nullable=False,
+        comment="Versão da carteira refletida nas análises do processador.",
+    )
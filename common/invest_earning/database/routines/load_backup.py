@@ -9,6 +9,8 @@ import click
 import invest_earning.database
 import pandas as pd
 import sqlalchemy as sa
+from invest_earning.database.base import WalletBase
+from invest_earning.database.wallet import ShareLedger, WalletVersion
 
 LOGGER = logging.getLogger(__name__)
 
@@ -41,18 +43,27 @@ def load_parquet_backup(
     # Find the most recent backup
     most_recent = directories[0]
 
-    # Find paths and table names
+    # Find paths and table names, older backups might have
+    #   tables which were removed from the schema (e.g.,
+    #   `earnings_rights`, derived from the transactions)
+    paths = list(most_recent.rglob("*.parquet"))
+    legacy = sorted(p.stem for p in paths if p.stem not in tables)
+    if legacy:
+        LOGGER.warning("Skipping tables no longer in the schema: %s.", legacy)
     tables_and_paths = sorted(
-        [
-            (tables[p.name.replace(".parquet", "")], p)
-            for p in most_recent.rglob("*.parquet")
-        ],
+        [(tables[p.stem], p) for p in paths if p.stem in tables],
         key=lambda v: Base.metadata.sorted_tables.index(v[0]),
     )
 
     # Remove skipped tables
     tables_and_paths = [e for e in tables_and_paths if e[0] not in skip_tables]
 
+    # Version counters are seeded by the migrations, thus they
+    #   aren't considered for emptiness and are upserted last
+    #   (overwriting the increments caused by the restore)
+    counters = [e for e in tables_and_paths if e[0] is WalletVersion.__table__]
+    tables_and_paths = [e for e in tables_and_paths if e not in counters]
+
     # Create session
     session = sa.orm.Session(sa.create_engine(db_url))
 
@@ -66,10 +77,20 @@ def load_parquet_backup(
         for table, path in tables_and_paths:
             # Load parquet
             df = pd.read_parquet(path)
+            if df.empty:
+                continue
 
             # Execute insert
             session.execute(sa.insert(table), df.to_dict(orient="records"))
 
+        # The ledger is derived from the transactions, thus it is
+        #   recomputed (older backups don't have it)
+        if Base is WalletBase:
+            ShareLedger.rebuild(session)
+
+        for _, path in counters:
+            _restore_counters(session, pd.read_parquet(path).to_dict(orient="records"))
+
         # Commit all changes
         session.commit()
     else:
@@ -78,5 +99,29 @@ def load_parquet_backup(
     session.close()
 
 
+def _restore_counters(session: sa.orm.Session, records: list[dict]):
+    if not records:
+        return
+
+    match session.get_bind().dialect.name:
+        case "postgresql":
+            insert = sa.dialects.postgresql.insert
+        case "sqlite":
+            insert = sa.dialects.sqlite.insert
+        case _:
+            # Fallback to ORM for other dialects
+            for record in records:
+                session.merge(WalletVersion(**record))
+            return
+
+    stmt = insert(WalletVersion).values(records)
+    session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[WalletVersion.table_name],
+            set_=dict(version=stmt.excluded.version),
+        )
+    )
+
+
 if __name__ == "__main__":
     load_parquet_backup()
@@ -2,5 +2,8 @@ from .asset import Asset, Earning, Transaction
 from .asset_document import AssetDocument
 from .economic import EconomicData
 from .entities import AssetKind, EarningKind, EconomicIndex, TransactionKind
+from .ledger import ShareLedger
 from .market_price import MarketPrice
-from .position import Position
+from .outbox import NotificationOutbox
+from .position import Position, PositionFrame
+from .version import WalletVersion
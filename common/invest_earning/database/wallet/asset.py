@@ -6,7 +6,7 @@ from datetime import date
 from typing import List, Optional
 
 from invest_earning.database.base import WalletBase
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.types import BigInteger, Integer, Numeric
 
@@ -42,6 +42,15 @@ class Asset(WalletBase):
 
 class Earning(WalletBase):
     __tablename__ = "earning"
+    __table_args__ = (
+        Index("ix_earning_payment_date_id", "payment_date", "id"),
+        Index(
+            "ix_earning_asset_b3_code_payment_date_id",
+            "asset_b3_code",
+            "payment_date",
+            "id",
+        ),
+    )
 
     id = mapped_column(
         BigInteger().with_variant(Integer, "sqlite"),
@@ -67,7 +76,9 @@ class Earning(WalletBase):
 
     # Transações que possuem direito a esse provento
     right_to_earnings: Mapped[List[Transaction]] = relationship(
-        secondary="earnings_rights", back_populates="entitled_to_earnings"
+        primaryjoin="and_(Earning.asset_b3_code == foreign(Transaction.asset_b3_code), "
+        "Transaction.date <= Earning.hold_date)",
+        viewonly=True,
     )
 
     def __repr__(self):
@@ -80,6 +91,10 @@ class Earning(WalletBase):
 
 class Transaction(WalletBase):
     __tablename__ = "transaction"
+    __table_args__ = (
+        Index("ix_transaction_date_id", "date", "id"),
+        Index("ix_transaction_asset_b3_code_date_id", "asset_b3_code", "date", "id"),
+    )
 
     id = mapped_column(
         BigInteger().with_variant(Integer, "sqlite"),
@@ -103,7 +118,9 @@ class Transaction(WalletBase):
 
     # Proventos sobre os quais essa transação possui direito
     entitled_to_earnings: Mapped[List[Earning]] = relationship(
-        secondary="earnings_rights", back_populates="right_to_earnings"
+        primaryjoin="and_(Transaction.asset_b3_code == foreign(Earning.asset_b3_code), "
+        "Earning.hold_date >= Transaction.date)",
+        viewonly=True,
     )
 
     def __repr__(self):
@@ -111,14 +128,3 @@ class Transaction(WalletBase):
             f"Transaction({self.asset_b3_code}, {self.kind.value}, "
             f"{self.value_per_share * self.shares:.2f})"
         )
-
-
-class EarningsRights(WalletBase):
-    __tablename__ = "earnings_rights"
-
-    earning = mapped_column(
-        ForeignKey("earning.id", ondelete="CASCADE"), primary_key=True
-    )
-    has_right = mapped_column(
-        ForeignKey("transaction.id", ondelete="CASCADE"), primary_key=True
-    )
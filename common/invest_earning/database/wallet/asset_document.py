@@ -4,7 +4,7 @@ para ativos.
 
 from datetime import date
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.types import BigInteger, Integer
 
@@ -13,6 +13,14 @@ from invest_earning.database.base import WalletBase
 
 class AssetDocument(WalletBase):
     __tablename__ = "asset_document"
+    __table_args__ = (
+        Index(
+            "ix_asset_document_asset_b3_code_publish_date_id",
+            "asset_b3_code",
+            "publish_date",
+            "id",
+        ),
+    )
 
     id = mapped_column(
         BigInteger().with_variant(Integer, "sqlite"),
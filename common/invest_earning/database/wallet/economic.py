@@ -14,7 +14,7 @@ class EconomicData(WalletBase):
         primary_key=True, comment="Indíce ecônomico que os dados se referem."
     )
     reference_date: Mapped[date] = mapped_column(
-        primary_key=True, comment="Data de referência."
+        primary_key=True, index=True, comment="Data de referência."
     )
     percentage_change = mapped_column(
         Numeric(),
@@ -0,0 +1,101 @@
+"""Livro de unidades em custódia.
+
+Para cada ativo, armazena a quantidade acumulada de
+unidades ao final de cada data com transações. As
+unidades com direito a um provento são as unidades
+em custódia na data de custódia (`hold_date`), obtidas
+com uma busca no índice `(asset_b3_code, date)`.
+"""
+
+from __future__ import annotations
+
+from datetime import date
+from typing import Iterable
+
+import sqlalchemy as sa
+from invest_earning.database.base import WalletBase
+from sqlalchemy import ForeignKey
+from sqlalchemy.orm import Mapped, Session, mapped_column
+from sqlalchemy.types import BigInteger
+
+from .asset import Transaction
+from .entities import TransactionKind
+
+
+class ShareLedger(WalletBase):
+    __tablename__ = "share_ledger"
+
+    asset_b3_code: Mapped[str] = mapped_column(
+        ForeignKey("asset.b3_code", ondelete="CASCADE", onupdate="CASCADE"),
+        primary_key=True,
+        comment="Ativo sobre o qual esse registro se refere.",
+    )
+    date: Mapped[date] = mapped_column(
+        primary_key=True, comment="Data das transações acumuladas."
+    )
+    shares = mapped_column(
+        BigInteger,
+        nullable=False,
+        comment="Unidades em custódia ao final da data.",
+    )
+
+    @classmethod
+    def shares_at(cls, asset_b3_code, reference_date) -> sa.ScalarSelect:
+        """Retorna uma subquery escalar com as unidades em
+        custódia do ativo ao final da data de referência.
+
+        Args:
+            asset_b3_code: código do ativo ou coluna
+                correlacionada com a query externa.
+            reference_date: data de referência ou coluna
+                correlacionada com a query externa.
+        """
+        return (
+            sa.select(cls.shares)
+            .where(cls.asset_b3_code == asset_b3_code)
+            .where(cls.date <= reference_date)
+            .order_by(cls.date.desc())
+            .limit(1)
+            .scalar_subquery()
+        )
+
+    @classmethod
+    def rebuild_query(cls) -> sa.Select:
+        """Retorna a query que calcula o livro a partir
+        das transações (total acumulado por ativo).
+        """
+        signed = sa.case(
+            (Transaction.kind == TransactionKind.buy, Transaction.shares),
+            else_=-Transaction.shares,
+        )
+        return sa.select(
+            Transaction.asset_b3_code,
+            Transaction.date,
+            sa.func.sum(sa.func.sum(signed)).over(
+                partition_by=Transaction.asset_b3_code, order_by=Transaction.date
+            ),
+        ).group_by(Transaction.asset_b3_code, Transaction.date)
+
+    @classmethod
+    def rebuild(cls, session: Session, b3_codes: Iterable[str] = None):
+        """Recalcula o livro dos ativos com um `DELETE` e um
+        `INSERT ... SELECT`.
+
+        Args:
+            session: sessão com o banco da carteira.
+            b3_codes: ativos cujo livro deve ser recalculado.
+                Se `None`, todos os ativos são recalculados.
+        """
+        table = cls.__table__
+        delete, query = sa.delete(table), cls.rebuild_query()
+        if b3_codes is not None:
+            b3_codes = list(b3_codes)
+            delete = delete.where(table.c.asset_b3_code.in_(b3_codes))
+            query = query.where(Transaction.asset_b3_code.in_(b3_codes))
+
+        session.execute(delete)
+        session.execute(
+            sa.insert(table).from_select(
+                [table.c.asset_b3_code, table.c.date, table.c.shares], query
+            )
+        )
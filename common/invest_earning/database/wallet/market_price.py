@@ -2,8 +2,9 @@
 
 from datetime import date
 
+import sqlalchemy as sa
 from invest_earning.database.base import WalletBase
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.types import Numeric
 
@@ -12,6 +13,13 @@ from .asset import Asset
 
 class MarketPrice(WalletBase):
     __tablename__ = "market_price"
+    __table_args__ = (
+        Index(
+            "ix_market_price_asset_b3_code_reference_date",
+            "asset_b3_code",
+            "reference_date",
+        ),
+    )
 
     # Identificação
     reference_date: Mapped[date] = mapped_column(
@@ -34,3 +42,25 @@ class MarketPrice(WalletBase):
 
     # Mapeamento do ativo
     asset: Mapped[Asset] = relationship()
+
+    @classmethod
+    def latest(cls, asset_b3_code, reference_date: date) -> sa.ScalarSelect:
+        """Retorna uma subquery escalar com a cota de fechamento
+        mais recente do ativo até a data de referência (inclusive).
+
+        A consulta é resolvida pelo índice `(asset_b3_code,
+        reference_date)`, sem percorrer o histórico do ativo.
+
+        Args:
+            asset_b3_code: código do ativo ou coluna
+                correlacionada com a query externa.
+            reference_date: data de referência.
+        """
+        return (
+            sa.select(cls.closing_price)
+            .where(cls.asset_b3_code == asset_b3_code)
+            .where(cls.reference_date <= reference_date)
+            .order_by(cls.reference_date.desc())
+            .limit(1)
+            .scalar_subquery()
+        )
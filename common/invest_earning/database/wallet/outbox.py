@@ -0,0 +1,30 @@
+"""Caixa de saída de notificações.
+
+Notificações são escritas na mesma transação das
+alterações que as originaram e enviadas ao broker
+posteriormente.
+"""
+
+from datetime import datetime
+
+from invest_earning.database.base import WalletBase
+from sqlalchemy import func
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.types import BigInteger, Integer
+
+
+class NotificationOutbox(WalletBase):
+    __tablename__ = "notification_outbox"
+
+    # Escritas na caixa de saída não alteram a versão da carteira
+    __table_args__ = {"info": dict(versioned=False)}
+
+    id = mapped_column(
+        BigInteger().with_variant(Integer, "sqlite"),
+        primary_key=True,
+        comment="ID automático da notificação.",
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        server_default=func.now(), comment="Momento de criação da notificação."
+    )
+    body: Mapped[str] = mapped_column(comment="Conteúdo da notificação.")
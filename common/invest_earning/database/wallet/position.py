@@ -2,13 +2,21 @@
 
 from dataclasses import dataclass, fields
 from datetime import date
+from typing import Iterable, Iterator, Sequence
 
+import numpy as np
+import pandas as pd
+import pyarrow as pa
 import sqlalchemy as sa
 import sqlalchemy.orm
 
 from .asset import Asset, AssetKind, Earning, Transaction, TransactionKind
+from .ledger import ShareLedger
 from .market_price import MarketPrice
 
+# Event types of `Position.get_series`
+_TRANSACTION_EVENT, _EARNING_EVENT, _PRICE_EVENT = 0, 1, 2
+
 
 @dataclass(frozen=True)
 class Position:
@@ -26,99 +34,308 @@ class Position:
 
     @classmethod
     def get(
-        cls, session: sa.orm.Session, reference_date: date = None
-    ) -> list["Position"]:
+        cls,
+        session: sa.orm.Session,
+        reference_date: date = None,
+        b3_codes: Iterable[str] = None,
+        asset_kinds: Iterable[AssetKind] = None,
+        as_frame: bool = False,
+    ) -> "list[Position] | PositionFrame":
+        """Calcula a posição de investimentos em uma data.
+
+        Args:
+            session: sessão com o banco da carteira.
+            reference_date: data de referência. Se `None`,
+                todas as transações são consideradas.
+            b3_codes: se passado, apenas esses ativos
+                são considerados.
+            asset_kinds: se passado, apenas ativos desses
+                tipos são considerados.
+            as_frame: se `True`, retorna as posições em
+                formato colunar (`PositionFrame`).
+
+        Returns:
+            list[Position] | PositionFrame: posições com
+                unidades na data de referência.
+        """
         if reference_date is None:
             reference_date = date.max
 
-        # Obtaining base information
-        base = cls._get_base(session, reference_date)
-        positions = []
-        for b in base:
-            data = dict()
-            data.update(b)
-
-            # Querying earnings
-            earnings = (
-                (
-                    session.query(Earning)
-                    .where(Earning.asset_b3_code == data["b3_code"])
-                    .where(Earning.payment_date <= reference_date)
+        # Base information and earnings aggregated by asset
+        base = cls._get_base(reference_date, b3_codes, asset_kinds)
+        earnings = cls._get_earnings(reference_date, b3_codes, asset_kinds)
+
+        # Utility operations (as floats, avoiding casts to
+        #   the precision of the columns on division)
+        total_invested = sa.type_coerce(base.c.total_invested, sa.Float)
+        total_earnings = sa.sql.func.coalesce(earnings.c.total_earnings, 0.0)
+        total_ir_adjusted_earnings = sa.type_coerce(
+            sa.sql.func.coalesce(earnings.c.total_ir_adjusted_earnings, 0.0),
+            sa.Float,
+        )
+        yield_on_cost = sa.case(
+            (total_invested != 0, 100 * total_ir_adjusted_earnings / total_invested),
+            else_=0.0,
+        )
+        rate_of_return = sa.case(
+            (
+                total_invested != 0,
+                100
+                * (base.c.balance + total_ir_adjusted_earnings - total_invested)
+                / total_invested,
+            ),
+            else_=0.0,
+        )
+
+        # Single round trip, no ORM objects
+        rows = session.execute(
+            sa.select(
+                base.c.b3_code,
+                base.c.shares,
+                base.c.avg_price,
+                total_invested,
+                base.c.asset_kind,
+                base.c.current_price,
+                base.c.balance,
+                total_earnings,
+                total_ir_adjusted_earnings,
+                yield_on_cost,
+                rate_of_return,
+            ).outerjoin(earnings, earnings.c.b3_code == base.c.b3_code)
+        ).all()
+        if as_frame:
+            return PositionFrame.from_rows(rows)
+        return [cls(*row) for row in rows]
+
+    @classmethod
+    def get_series(
+        cls,
+        session: sa.orm.Session,
+        dates: Iterable[date],
+        b3_codes: Iterable[str] = None,
+        asset_kinds: Iterable[AssetKind] = None,
+        as_frame: bool = False,
+    ) -> "dict[date, list[Position] | PositionFrame]":
+        """Calcula a posição de investimentos em múltiplas datas.
+
+        Transações, proventos e cotações são obtidos em uma
+        única query ordenada por data e percorridos uma única
+        vez, acumulando os totais de cada ativo.
+
+        Args:
+            session: sessão com o banco da carteira.
+            dates: datas de referência.
+            b3_codes: se passado, apenas esses ativos
+                são considerados.
+            asset_kinds: se passado, apenas ativos desses
+                tipos são considerados.
+            as_frame: se `True`, retorna as posições de cada
+                data em formato colunar (`PositionFrame`).
+
+        Returns:
+            dict[date, list[Position] | PositionFrame]: posições
+                com unidades em cada data de referência.
+        """
+        dates = sorted(set(dates))
+        if not dates:
+            return dict()
+
+        rows = session.execute(cls._get_events(dates[-1], b3_codes, asset_kinds)).all()
+
+        # Sweep events with running totals per asset,
+        #   stopping at each reference date
+        totals, series, i = dict(), dict(), 0
+        for reference_date in dates:
+            while i < len(rows) and rows[i].date <= reference_date:
+                event, b3_code, asset_kind, _, v0, v1, v2 = rows[i]
+                t = totals.setdefault(
+                    b3_code,
+                    dict(
+                        asset_kind=asset_kind,
+                        buy=0,
+                        sell=0,
+                        total_buy=0.0,
+                        price=None,
+                        earnings=0.0,
+                        ir_adjusted_earnings=0.0,
+                    ),
                 )
-                .options(sa.orm.selectinload(Earning.right_to_earnings))
-                .all()
+                if event == _TRANSACTION_EVENT:
+                    t["buy"] += round(v0)
+                    t["sell"] += round(v1)
+                    t["total_buy"] += v2
+                elif event == _EARNING_EVENT:
+                    t["earnings"] += v0
+                    t["ir_adjusted_earnings"] += v1
+                else:
+                    t["price"] = v0
+                i += 1
+
+            snapshot = [
+                cls._from_totals(b3_code, t)
+                for b3_code, t in totals.items()
+                if t["buy"] - t["sell"] > 0
+            ]
+            series[reference_date] = (
+                PositionFrame.from_rows(snapshot)
+                if as_frame
+                else [cls(*row) for row in snapshot]
             )
 
-            # Find total earnings
-            total_earnings, total_ir_adjusted_earnings = 0, 0
-            for e in earnings:
-                # Find shares
-                buy_shares, sell_shares = 0, 0
-                for t in e.right_to_earnings:
-                    if t.kind == TransactionKind.buy:
-                        buy_shares += t.shares
-                    else:
-                        sell_shares += t.shares
-                shares = buy_shares - sell_shares
-
-                # Update total
-                v = shares * e.value_per_share
-
-                total_earnings += v
-                total_ir_adjusted_earnings += v * (1 - e.ir_percentage / 100)
-
-            # Create position
-            total_invested = data["total_invested"]
-            data["total_earnings"] = total_earnings
-            data["total_ir_adjusted_earnings"] = total_ir_adjusted_earnings
-            data["yield_on_cost"] = (
+        return series
+
+    @classmethod
+    def _from_totals(cls, b3_code: str, totals: dict) -> tuple:
+        shares = totals["buy"] - totals["sell"]
+        avg_price = totals["total_buy"] / totals["buy"]
+        total_invested = shares * avg_price
+        current_price = avg_price if totals["price"] is None else totals["price"]
+        balance = shares * current_price
+        total_ir_adjusted_earnings = totals["ir_adjusted_earnings"]
+        # Same order as the fields of Position
+        return (
+            b3_code,
+            shares,
+            avg_price,
+            total_invested,
+            totals["asset_kind"],
+            current_price,
+            balance,
+            totals["earnings"],
+            total_ir_adjusted_earnings,
+            (
                 (100 * total_ir_adjusted_earnings / total_invested)
                 if total_invested != 0
                 else 0
-            )
-            data["rate_of_return"] = (
-                (
-                    100
-                    * (data["balance"] + total_ir_adjusted_earnings - total_invested)
-                    / total_invested
-                )
-                if data["total_invested"] != 0
+            ),
+            (
+                (100 * (balance + total_ir_adjusted_earnings - total_invested))
+                / total_invested
+                if total_invested != 0
                 else 0
+            ),
+        )
+
+    @classmethod
+    def _get_events(
+        cls,
+        end: date,
+        b3_codes: Iterable[str] = None,
+        asset_kinds: Iterable[AssetKind] = None,
+    ) -> sa.Select:
+        # Every event has the same shape, values depend on its type:
+        #   transaction -> (buy shares, sell shares, total bought)
+        #   earning -> (total earnings, IR adjusted total, unused)
+        #   price -> (closing price, unused, unused)
+        def _value(v) -> sa.Cast:
+            return sa.cast(v, sa.Float)
+
+        def _filter(query: sa.Select, b3_code) -> sa.Select:
+            if b3_codes is not None:
+                query = query.where(b3_code.in_(list(b3_codes)))
+            if asset_kinds is not None:
+                query = query.where(Asset.kind.in_(list(asset_kinds)))
+            return query
+
+        is_buy = Transaction.kind == TransactionKind.buy
+        transactions = _filter(
+            sa.select(
+                sa.literal(_TRANSACTION_EVENT).label("event"),
+                Transaction.asset_b3_code.label("b3_code"),
+                Asset.kind.label("asset_kind"),
+                Transaction.date.label("date"),
+                _value(sa.case((is_buy, Transaction.shares), else_=0)).label("v0"),
+                _value(sa.case((is_buy, 0), else_=Transaction.shares)).label("v1"),
+                _value(
+                    sa.case(
+                        (is_buy, Transaction.value_per_share * Transaction.shares),
+                        else_=0,
+                    )
+                ).label("v2"),
             )
-            positions.append(cls(**data))
+            .join(Asset, Asset.b3_code == Transaction.asset_b3_code)
+            .where(Transaction.date <= end),
+            Transaction.asset_b3_code,
+        )
 
-        return positions
+        value = cls._earning_value()
+        ir = sa.sql.func.coalesce(Earning.ir_percentage, 0.0)
+        earnings = _filter(
+            sa.select(
+                sa.literal(_EARNING_EVENT),
+                Earning.asset_b3_code,
+                Asset.kind,
+                Earning.payment_date,
+                _value(value),
+                _value(value * (1 - ir / 100)),
+                _value(sa.literal(0.0)),
+            )
+            .join(Asset, Asset.b3_code == Earning.asset_b3_code)
+            .where(Earning.payment_date <= end),
+            Earning.asset_b3_code,
+        )
 
-    @classmethod
-    def _get_base(
-        cls, session: sa.orm.Session, reference_date: date = None
-    ) -> list[dict]:
-        # Most recent prices
-        max_date = (
-            session.query(
+        prices = _filter(
+            sa.select(
+                sa.literal(_PRICE_EVENT),
                 MarketPrice.asset_b3_code,
-                sa.sql.func.max(MarketPrice.reference_date).label("reference_date"),
+                Asset.kind,
+                MarketPrice.reference_date,
+                _value(MarketPrice.closing_price),
+                _value(sa.literal(0.0)),
+                _value(sa.literal(0.0)),
             )
-            .where(MarketPrice.reference_date <= reference_date)
-            .group_by(MarketPrice.asset_b3_code)
-            .subquery()
+            .join(Asset, Asset.b3_code == MarketPrice.asset_b3_code)
+            .where(MarketPrice.reference_date <= end),
+            MarketPrice.asset_b3_code,
         )
-        most_recent_prices = (
-            session.query(
-                MarketPrice.asset_b3_code.label("b3_code"),
-                MarketPrice.closing_price.label("closing_price"),
+
+        events = sa.union_all(transactions, earnings, prices).subquery()
+        return sa.select(events).order_by(events.c.date, events.c.event)
+
+    @staticmethod
+    def _earning_value() -> sa.ColumnElement:
+        # Shares held on the hold date are entitled to the earning
+        shares = ShareLedger.shares_at(Earning.asset_b3_code, Earning.hold_date)
+        return sa.sql.func.coalesce(shares, 0) * Earning.value_per_share
+
+    @classmethod
+    def _get_earnings(
+        cls,
+        reference_date: date,
+        b3_codes: Iterable[str] = None,
+        asset_kinds: Iterable[AssetKind] = None,
+    ) -> sa.CTE:
+        value = cls._earning_value()
+        ir = sa.sql.func.coalesce(Earning.ir_percentage, 0.0)
+        query = sa.select(
+            Earning.asset_b3_code.label("b3_code"),
+            sa.sql.func.sum(value).label("total_earnings"),
+            sa.sql.func.sum(value * (1 - ir / 100)).label("total_ir_adjusted_earnings"),
+        ).where(Earning.payment_date <= reference_date)
+        if b3_codes is not None:
+            query = query.where(Earning.asset_b3_code.in_(list(b3_codes)))
+        if asset_kinds is not None:
+            query = query.where(
+                Earning.asset_b3_code.in_(
+                    sa.select(Asset.b3_code).where(Asset.kind.in_(list(asset_kinds)))
+                )
             )
-            .where(MarketPrice.asset_b3_code == max_date.c.asset_b3_code)
-            .where(MarketPrice.reference_date == max_date.c.reference_date)
-            .subquery()
-        )
+        return query.group_by(Earning.asset_b3_code).cte("position_earnings")
 
-        # Aggregate transactions and market prices
+    @classmethod
+    def _get_base(
+        cls,
+        reference_date: date,
+        b3_codes: Iterable[str] = None,
+        asset_kinds: Iterable[AssetKind] = None,
+    ) -> sa.Subquery:
+        # Aggregate transactions and most recent market prices
         is_buy = sa.sql.func.cast(Transaction.kind == TransactionKind.buy, sa.INTEGER)
         is_sell = 1 - is_buy
         asset_b3_code = Transaction.asset_b3_code.label("b3_code")
         cte = (
-            session.query(
+            sa.select(
                 asset_b3_code,
                 Asset.kind.label("asset_kind"),
                 sa.sql.func.sum(is_buy * Transaction.shares).label("buy"),
@@ -129,40 +346,107 @@ class Position:
                 sa.sql.func.sum(
                     is_sell * Transaction.value_per_share * Transaction.shares
                 ).label("total_sell"),
+                MarketPrice.latest(Transaction.asset_b3_code, reference_date).label(
+                    "closing_price"
+                ),
             )
             .join(Asset, Asset.b3_code == asset_b3_code)
             .where(Transaction.date <= reference_date)
-            .group_by(Transaction.asset_b3_code, Asset.b3_code)
-            .cte()
         )
+        if b3_codes is not None:
+            cte = cte.where(Transaction.asset_b3_code.in_(list(b3_codes)))
+        if asset_kinds is not None:
+            cte = cte.where(Asset.kind.in_(list(asset_kinds)))
+        cte = cte.group_by(Transaction.asset_b3_code, Asset.b3_code).cte()
 
         # Utility operations
         shares = cte.c.buy - cte.c.sell
         avg_price = cte.c.total_buy / cte.c.buy
         total_invested = shares * avg_price
-        current_price = sa.sql.func.coalesce(
-            most_recent_prices.c.closing_price,
-            avg_price,
-        )
+        current_price = sa.sql.func.coalesce(cte.c.closing_price, avg_price)
         balance = shares * current_price
 
-        return list(
-            map(
-                lambda v: {k.name: v for k, v in zip(fields(cls), v)},
-                session.query(
-                    cte.c.b3_code,
-                    shares,
-                    avg_price,
-                    total_invested,
-                    cte.c.asset_kind,
-                    current_price,
-                    balance,
-                )
-                .where(shares > 0)
-                .outerjoin(
-                    most_recent_prices,
-                    most_recent_prices.c.b3_code == cte.c.b3_code,
-                )
-                .all(),
+        return (
+            sa.select(
+                cte.c.b3_code,
+                shares.label("shares"),
+                avg_price.label("avg_price"),
+                total_invested.label("total_invested"),
+                cte.c.asset_kind,
+                current_price.label("current_price"),
+                balance.label("balance"),
+            )
+            .where(shares > 0)
+            .subquery()
+        )
+
+
+class PositionFrame:
+    """Posições em formato colunar.
+
+    Cada campo de `Position` é armazenado em um array
+    NumPy. Instâncias de `Position` são criadas apenas
+    sob demanda (iteração ou indexação), permitindo a
+    conversão para pandas/Arrow sem objetos por linha.
+    """
+
+    FIELDS = [f.name for f in fields(Position)]
+    _DTYPES = dict(
+        b3_code=object,
+        shares=np.int64,
+        asset_kind=object,
+    )
+
+    def __init__(self, columns: dict[str, np.ndarray]):
+        assert list(columns) == self.FIELDS
+        self._columns = columns
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Sequence]) -> "PositionFrame":
+        values = zip(*rows) if len(rows) > 0 else [()] * len(cls.FIELDS)
+        return cls(
+            {
+                name: np.array(v, dtype=cls._DTYPES.get(name, np.float64))
+                for name, v in zip(cls.FIELDS, values)
+            }
+        )
+
+    def __len__(self) -> int:
+        return len(self._columns["b3_code"])
+
+    def __getitem__(self, key: str | int) -> np.ndarray | Position:
+        if isinstance(key, str):
+            return self._columns[key]
+        return Position(
+            *(
+                v.item() if isinstance(v, np.generic) else v
+                for v in (c[key] for c in self._columns.values())
             )
         )
+
+    def __iter__(self) -> Iterator[Position]:
+        for row in zip(*(c.tolist() for c in self._columns.values())):
+            yield Position(*row)
+
+    def to_dict(self) -> dict[str, list]:
+        """Retorna as colunas como listas de valores
+        nativos, prontas para serialização JSON.
+        """
+        data = {k: v.tolist() for k, v in self._columns.items()}
+        data["asset_kind"] = [k.value for k in data["asset_kind"]]
+        return data
+
+    def to_pandas(self) -> pd.DataFrame:
+        return pd.DataFrame(self._columns, columns=self.FIELDS)
+
+    def to_arrow(self) -> pa.Table:
+        data = dict(self._columns)
+        data["asset_kind"] = np.array(
+            [k.value for k in data["asset_kind"]], dtype=object
+        )
+        return pa.table(
+            {
+                k: pa.array(v, type=pa.string() if v.dtype == object else None)
+                for k, v in data.items()
+            }
+        )
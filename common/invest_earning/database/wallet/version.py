@@ -0,0 +1,152 @@
+"""Versão das tabelas da carteira.
+
+Toda escrita realizada através de uma `Session` em
+tabelas da carteira incrementa (na mesma transação) o
+contador da tabela escrita e das tabelas que dependem
+dela via chave estrangeira.
+"""
+
+import itertools
+
+import sqlalchemy as sa
+from invest_earning.database.base import WalletBase
+from sqlalchemy import event
+from sqlalchemy.orm import Mapped, Session, mapped_column
+from sqlalchemy.types import BigInteger
+
+
+class WalletVersion(WalletBase):
+    __tablename__ = "wallet_version"
+
+    table_name: Mapped[str] = mapped_column(
+        primary_key=True, comment="Nome da tabela versionada."
+    )
+    version = mapped_column(
+        BigInteger,
+        nullable=False,
+        default=0,
+        comment="Contador incrementado a cada escrita na tabela.",
+    )
+
+    @classmethod
+    def get(cls, session: Session, tables: list[str] | None = None) -> int:
+        """Retorna a versão agregada (soma dos contadores)
+        das tabelas selecionadas.
+
+        Args:
+            session: sessão com o banco da carteira.
+            tables: tabelas consideradas. Se `None`,
+                todas as tabelas são consideradas.
+
+        Returns:
+            int: versão agregada, cresce a cada
+                escrita em alguma das tabelas.
+        """
+        query = sa.select(sa.func.coalesce(sa.func.sum(cls.version), 0))
+        if tables is not None:
+            query = query.where(cls.table_name.in_(tables))
+        return session.scalar(query)
+
+
+def _dependents(table_names: set[str]) -> set[str]:
+    # Writes might cascade (ondelete/onupdate) to
+    #   tables referencing the written ones
+    tables = WalletBase.metadata.tables
+    result, pending = set(), list(table_names)
+    while pending:
+        name = pending.pop()
+        if name in result:
+            continue
+        result.add(name)
+        pending.extend(
+            t.name
+            for t in tables.values()
+            if any(fk.column.table.name == name for fk in t.foreign_keys)
+        )
+    result.discard(WalletVersion.__tablename__)
+    return result
+
+
+def _bump(session: Session, table_names: set[str]):
+    table_names = _dependents(table_names)
+    if not table_names:
+        return
+
+    # Counters are upserted, since rows might be missing (e.g.,
+    #   databases created without the migrations)
+    table, conn = WalletVersion.__table__, session.connection()
+    match conn.dialect.name:
+        case "postgresql":
+            insert = sa.dialects.postgresql.insert
+        case "sqlite":
+            insert = sa.dialects.sqlite.insert
+        case _:
+            insert = None
+
+    if insert is not None:
+        stmt = insert(table).values(
+            [dict(table_name=name, version=1) for name in sorted(table_names)]
+        )
+        conn.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[table.c.table_name],
+                set_=dict(version=table.c.version + 1),
+            )
+        )
+        return
+
+    # Fallback for other dialects
+    result = conn.execute(
+        sa.update(table)
+        .where(table.c.table_name.in_(sorted(table_names)))
+        .values(version=table.c.version + 1)
+    )
+    if result.rowcount != len(table_names):
+        existing = set(
+            conn.scalars(
+                sa.select(table.c.table_name).where(
+                    table.c.table_name.in_(sorted(table_names))
+                )
+            )
+        )
+        conn.execute(
+            sa.insert(table),
+            [
+                dict(table_name=name, version=1)
+                for name in sorted(table_names - existing)
+            ],
+        )
+
+
+def _wallet_table_name(table) -> str | None:
+    if getattr(table, "metadata", None) is not WalletBase.metadata:
+        return None
+    if not table.info.get("versioned", True):
+        return None
+    return table.name
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_after_flush(session, flush_context):
+    _bump(
+        session,
+        {
+            name
+            for obj in itertools.chain(session.new, session.dirty, session.deleted)
+            if (name := _wallet_table_name(getattr(obj, "__table__", None)))
+        },
+    )
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _bump_on_execute(orm_execute_state):
+    if not (
+        orm_execute_state.is_insert
+        or orm_execute_state.is_update
+        or orm_execute_state.is_delete
+    ):
+        return
+
+    name = _wallet_table_name(getattr(orm_execute_state.statement, "table", None))
+    if name:
+        _bump(orm_execute_state.session, {name})
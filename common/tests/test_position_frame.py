@@ -0,0 +1,42 @@
+import pyarrow as pa
+import pytest
+from invest_earning.database.wallet import AssetKind, Position, PositionFrame
+
+_ROWS = [
+    ("ABCD11", 10, 10.0, 100.0, AssetKind.fii, 11.0, 110.0, 1.0, 1.0, 1.0, 11.0),
+    ("EFGH3", 5, 20.0, 100.0, AssetKind.stock, 18.0, 90.0, 2.0, 1.7, 1.7, -8.3),
+]
+
+
+def test_index_rows():
+    frame = PositionFrame.from_rows(_ROWS)
+    assert frame[0] == Position(*_ROWS[0])
+    assert frame[-1] == Position(*_ROWS[1])
+    assert frame[-2] == frame[0]
+    assert list(frame) == [frame[0], frame[1]]
+
+    for key in [2, -3]:
+        with pytest.raises(IndexError):
+            frame[key]
+
+
+@pytest.mark.parametrize("rows", [_ROWS, []], ids=["rows", "empty"])
+def test_to_arrow_schema(rows):
+    table = PositionFrame.from_rows(rows).to_arrow()
+    assert table.num_rows == len(rows)
+    assert table.column_names == PositionFrame.FIELDS
+    assert table.schema.field("b3_code").type == pa.string()
+    assert table.schema.field("asset_kind").type == pa.string()
+    assert table.schema.field("shares").type == pa.int64()
+    assert table.schema.field("avg_price").type == pa.float64()
+
+
+def test_empty_frame():
+    frame = PositionFrame.from_rows([])
+    assert len(frame) == 0
+    assert list(frame) == []
+    assert frame.to_dict() == {name: [] for name in PositionFrame.FIELDS}
+    assert frame.to_pandas().empty
+
+    with pytest.raises(IndexError):
+        frame[-1]
@@ -68,8 +68,7 @@ def create_transaction(data: ScopedState, callback: Callable[[], None] = None):
     else:
         data = data.bulk_data
 
-    for d in data:
-        WalletApi.create_transaction(**d)
+    WalletApi.create_transactions(data)
 
     if callback:
         callback()
@@ -106,8 +105,7 @@ def create_earning(data: ScopedState, callback: Callable[[], None] = None):
     else:
         data = data.bulk_data
 
-    for d in data:
-        WalletApi.create_earning(**d)
+    WalletApi.create_earnings(data)
 
     if callback:
         callback()
@@ -4,9 +4,12 @@ de gerenciamento da carteira.
 
 import json
 import logging
+import threading
+from collections import OrderedDict
 from datetime import date
 
 import pandas as pd
+import pyarrow as pa
 import requests
 
 from .config import WALLET_CONFIG as config
@@ -15,6 +18,26 @@ logger = logging.getLogger(__name__)
 
 
 class Client:
+    # Maximum page size accepted by the API
+    _PAGE_SIZE = 1000
+    _ARROW_STREAM = "application/vnd.apache.arrow.stream"
+
+    # Maximum number of responses kept for revalidation
+    _CACHE_SIZE = 128
+    _POSITION_COLUMNS = [
+        "b3_code",
+        "shares",
+        "avg_price",
+        "total_invested",
+        "asset_kind",
+        "current_price",
+        "balance",
+        "total_earnings",
+        "total_ir_adjusted_earnings",
+        "yield_on_cost",
+        "rate_of_return",
+    ]
+
     def __init__(self, base_url: str = None):
         if base_url is None:
             base_url = str(config.WALLET_API_URL)
@@ -26,12 +49,13 @@ class Client:
         self._economic_url = self._join(self._url, "economic")
         self._position_url = self._join(self._url, "position")
         self._document_url = self._join(self._url, "document")
+        self._responses = OrderedDict()
+        self._lock = threading.Lock()
 
     def list_assets(self) -> pd.DataFrame:
-        response = requests.get(self._join(self._asset_url, "list"))
-        response.raise_for_status()
         df = pd.DataFrame(
-            response.json(), columns=["b3_code", "kind", "name", "description", "added"]
+            self._get(self._join(self._asset_url, "list")),
+            columns=["b3_code", "kind", "name", "description", "added"],
         )
         return df.assign(added=df.added.map(date.fromisoformat))
 
@@ -86,11 +110,25 @@ class Client:
             ),
         ).raise_for_status()
 
-    def list_earnings(self) -> pd.DataFrame:
-        response = requests.get(self._join(self._earning_url, "list"))
-        response.raise_for_status()
-        df = pd.DataFrame(
-            response.json(),
+    def list_earnings(
+        self,
+        asset_b3_code: str = None,
+        kinds: list[str] = None,
+        start: date = None,
+        end: date = None,
+        limit: int = None,
+        cursor: str = None,
+    ) -> tuple[pd.DataFrame, str | None]:
+        return self._list(
+            self._join(self._earning_url, "list"),
+            dict(
+                asset_b3_code=asset_b3_code,
+                kind=kinds,
+                start=self._maybe_date_to_isoformat(start),
+                end=self._maybe_date_to_isoformat(end),
+                sort_by="payment_date",
+                order="desc",
+            ),
             columns=[
                 "id",
                 "asset_b3_code",
@@ -100,9 +138,9 @@ class Client:
                 "ir_percentage",
                 "kind",
             ],
-        )
-        return df.assign(
-            **{k: df[k].map(date.fromisoformat) for k in ["hold_date", "payment_date"]}
+            dates=["hold_date", "payment_date"],
+            limit=limit,
+            cursor=cursor,
         )
 
     def create_earning(
@@ -135,6 +173,26 @@ class Client:
             raise
         return response.json()["id"]
 
+    def create_earnings(self, data: list[dict]) -> list[int]:
+        data = [
+            dict(
+                d,
+                hold_date=self._maybe_date_to_isoformat(d["hold_date"]),
+                payment_date=self._maybe_date_to_isoformat(d["payment_date"]),
+            )
+            for d in data
+        ]
+        response = requests.post(
+            self._join(self._earning_url, "bulk"),
+            json=dict(data=data),
+        )
+        try:
+            response.raise_for_status()
+        except Exception as e:
+            logger.critical("%s:\n%s", e, response.text)
+            raise
+        return [d["id"] for d in response.json()]
+
     def update_earning(
         self,
         earning_id: int,
@@ -181,11 +239,25 @@ class Client:
             )
         ).raise_for_status()
 
-    def list_transactions(self) -> pd.DataFrame:
-        response = requests.get(self._join(self._transaction_url, "list"))
-        response.raise_for_status()
-        df = pd.DataFrame(
-            response.json(),
+    def list_transactions(
+        self,
+        asset_b3_code: str = None,
+        kinds: list[str] = None,
+        start: date = None,
+        end: date = None,
+        limit: int = None,
+        cursor: str = None,
+    ) -> tuple[pd.DataFrame, str | None]:
+        return self._list(
+            self._join(self._transaction_url, "list"),
+            dict(
+                asset_b3_code=asset_b3_code,
+                kind=kinds,
+                start=self._maybe_date_to_isoformat(start),
+                end=self._maybe_date_to_isoformat(end),
+                sort_by="date",
+                order="desc",
+            ),
             columns=[
                 "id",
                 "asset_b3_code",
@@ -194,8 +266,10 @@ class Client:
                 "value_per_share",
                 "shares",
             ],
+            dates=["date"],
+            limit=limit,
+            cursor=cursor,
         )
-        return df.assign(date=df["date"].map(date.fromisoformat))
 
     def create_transaction(
         self,
@@ -222,6 +296,19 @@ class Client:
             raise
         return response.json()["id"]
 
+    def create_transactions(self, data: list[dict]) -> list[int]:
+        data = [dict(d, date=self._maybe_date_to_isoformat(d["date"])) for d in data]
+        response = requests.post(
+            self._join(self._transaction_url, "bulk"),
+            json=dict(data=data),
+        )
+        try:
+            response.raise_for_status()
+        except Exception as e:
+            logger.critical("%s:\n%s", e, response.text)
+            raise
+        return [d["id"] for d in response.json()]
+
     def update_transaction(
         self,
         transaction_id: int,
@@ -249,13 +336,27 @@ class Client:
             ),
         ).raise_for_status()
 
-    def list_economic(self) -> pd.DataFrame:
-        response = requests.get(self._join(self._economic_url, "list"))
-        response.raise_for_status()
-        df = pd.DataFrame(
-            response.json(), columns=["index", "reference_date", "percentage_change"]
+    def list_economic(
+        self,
+        indices: list[str] = None,
+        start: date = None,
+        end: date = None,
+        limit: int = None,
+        cursor: str = None,
+    ) -> tuple[pd.DataFrame, str | None]:
+        return self._list(
+            self._join(self._economic_url, "list"),
+            dict(
+                index=indices,
+                start=self._maybe_date_to_isoformat(start),
+                end=self._maybe_date_to_isoformat(end),
+                order="desc",
+            ),
+            columns=["index", "reference_date", "percentage_change"],
+            dates=["reference_date"],
+            limit=limit,
+            cursor=cursor,
         )
-        return df.assign(reference_date=df["reference_date"].map(date.fromisoformat))
 
     def economic_add(self, data: list[dict] | pd.DataFrame):
         if isinstance(data, pd.DataFrame):
@@ -289,35 +390,125 @@ class Client:
             reference_date = date.today()
 
         response = requests.get(
-            self._join(self._position_url, "on", reference_date.isoformat())
+            self._join(self._position_url, "on", reference_date.isoformat()),
+            params=dict(orient="columns"),
         )
         response.raise_for_status()
-        return pd.DataFrame(
-            response.json(),
-            columns=[
-                "b3_code",
-                "shares",
-                "avg_price",
-                "total_invested",
-                "asset_kind",
-                "current_price",
-                "balance",
-                "total_earnings",
-                "total_ir_adjusted_earnings",
-                "yield_on_cost",
-                "rate_of_return",
-            ],
-        )
+        return pd.DataFrame(response.json(), columns=self._POSITION_COLUMNS)
+
+    def get_position_history(
+        self, start: date, end: date = None, freq: str = "M"
+    ) -> pd.DataFrame:
+        if end is None:
+            end = date.today()
 
-    def list_documents(self) -> pd.DataFrame:
-        response = requests.get(self._join(self._document_url, "list"))
+        response = requests.get(
+            self._join(self._position_url, "history"),
+            params=dict(
+                start=start.isoformat(),
+                end=end.isoformat(),
+                freq=freq,
+                orient="columns",
+            ),
+        )
         response.raise_for_status()
-        df = pd.DataFrame(
-            response.json(), columns=["asset_b3_code", "title", "publish_date", "url"]
+        return pd.concat(
+            [
+                pd.DataFrame(h["positions"], columns=self._POSITION_COLUMNS).assign(
+                    reference_date=date.fromisoformat(h["reference_date"])
+                )
+                for h in response.json()
+            ],
+            ignore_index=True,
+        )[["reference_date", *self._POSITION_COLUMNS]]
+
+    def list_documents(
+        self, asset_b3_code: str = None, start: date = None, end: date = None
+    ) -> pd.DataFrame:
+        df, _ = self._list(
+            self._join(self._document_url, "list"),
+            dict(
+                asset_b3_code=asset_b3_code,
+                start=self._maybe_date_to_isoformat(start),
+                end=self._maybe_date_to_isoformat(end),
+                sort_by="publish_date",
+                order="desc",
+            ),
+            columns=["asset_b3_code", "title", "publish_date", "url"],
+            dates=["publish_date"],
         )
-        df.publish_date = pd.to_datetime(df.publish_date).dt.date
         return df
 
+    def _list(
+        self,
+        url: str,
+        params: dict,
+        columns: list[str],
+        dates: list[str],
+        limit: int = None,
+        cursor: str = None,
+    ) -> tuple[pd.DataFrame, str | None]:
+        # Empty multi-valued filters match nothing
+        if any(isinstance(v, list) and not v for v in params.values()):
+            return pd.DataFrame(columns=columns), None
+
+        # Without limit, all records are streamed as Arrow
+        if limit is None:
+            table = self._get(url, dict(params, cursor=cursor), self._ARROW_STREAM)
+            return table.to_pandas()[columns], None
+
+        # Otherwise, follow the pages until `limit` records
+        data = []
+        while True:
+            page = self._get(
+                url,
+                dict(
+                    params, cursor=cursor, limit=min(self._PAGE_SIZE, limit - len(data))
+                ),
+            )
+            data.extend(page["data"])
+            cursor = page["next_cursor"]
+
+            if cursor is None or len(data) >= limit:
+                df = pd.DataFrame(data, columns=columns)
+                return (
+                    df.assign(**{k: df[k].map(date.fromisoformat) for k in dates}),
+                    cursor,
+                )
+
+    def _get(self, url: str, params: dict = None, accept: str = None):
+        # Previous responses are revalidated through their ETags,
+        #   unchanged data costs a single empty response
+        key = (url, json.dumps(params, sort_keys=True), accept)
+        headers = dict() if accept is None else dict(Accept=accept)
+        with self._lock:
+            cached = self._responses.get(key)
+        if cached is not None:
+            headers["If-None-Match"] = cached[0]
+
+        with requests.get(
+            url, params=params, headers=headers, stream=accept == self._ARROW_STREAM
+        ) as response:
+            if response.status_code == 304 and cached is not None:
+                etag, data = cached
+            else:
+                response.raise_for_status()
+                etag = response.headers.get("ETag")
+                if accept == self._ARROW_STREAM:
+                    response.raw.decode_content = True
+                    with pa.ipc.open_stream(response.raw) as reader:
+                        data = reader.read_all()
+                else:
+                    data = response.json()
+
+        if etag is not None:
+            with self._lock:
+                self._responses[key] = (etag, data)
+                self._responses.move_to_end(key)
+                while len(self._responses) > self._CACHE_SIZE:
+                    self._responses.popitem(last=False)
+        return data
+
     @staticmethod
     def _maybe_date_to_isoformat(v: date | None) -> str | None:
         if isinstance(v, date):
@@ -14,3 +14,4 @@ EarningKinds: list[str] = [
     "Juros sobre Capital Próprio",
     "Rendimento Tributável",
 ]
+ListPageSize: int = 200
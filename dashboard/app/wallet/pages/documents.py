@@ -11,7 +11,7 @@ from app.wallet.components import dataframes
 # ===== Inicialização da página =====
 state = PageState("documents")
 today = date.today()
-documents = WalletApi.list_documents().sort_values("publish_date", ascending=False)
+asset_codes = WalletApi.list_assets().b3_code.sort_values().tolist()
 
 # ==================================================================
 # === Título ===
@@ -21,7 +21,7 @@ st.title("Relatórios & Documentos")
 cols = st.columns(3)
 asset = cols[0].selectbox(
     "Ativo:",
-    ["Todos"] + documents.asset_b3_code.sort_values().unique().tolist(),
+    ["Todos"] + asset_codes,
     key=state.register_component("filter_asset_code"),
 )
 start_date = cols[1].date_input(
@@ -37,11 +37,9 @@ end_date = cols[2].date_input(
     format=config.ST_DATE_FORMAT,
 )
 
-
-documents = documents[
-    (documents.publish_date >= start_date) & (documents.publish_date <= end_date)
-]
-if asset != "Todos":
-    documents = documents[documents.asset_b3_code == asset]
-
+documents = WalletApi.list_documents(
+    asset_b3_code=None if asset == "Todos" else asset,
+    start=start_date,
+    end=end_date,
+)
 dataframes.document_dataframe(documents)
@@ -153,6 +153,13 @@ dataframes.transaction_dataframe(
     selection_mode="single-row",
     selection_callable=select_transaction,
 )
+if state.variables.transactions_cursor is not None:
+    st.button(
+        "Carregar mais transações",
+        icon=":material/expand_more:",
+        use_container_width=True,
+        on_click=functools.partial(state.load_more, "transactions"),
+    )
 
 if st.button(
     "Importar transações",
@@ -203,6 +210,13 @@ dataframes.earning_dataframe(
     selection_mode="single-row",
     selection_callable=select_earning,
 )
+if state.variables.earnings_cursor is not None:
+    st.button(
+        "Carregar mais proventos",
+        icon=":material/expand_more:",
+        use_container_width=True,
+        on_click=functools.partial(state.load_more, "earnings"),
+    )
 
 if st.button(
     "Importar proventos",
@@ -232,6 +246,13 @@ if st.button(
 
 # Listagem
 dataframes.economic_data_dataframe(state.variables.economic)
+if state.variables.economic_cursor is not None:
+    st.button(
+        "Carregar mais dados econômicos",
+        icon=":material/expand_more:",
+        use_container_width=True,
+        on_click=functools.partial(state.load_more, "economic"),
+    )
 
 if st.button(
     "Importar índices econônomicos",
@@ -40,17 +40,14 @@ class PositionsState(PageState):
             n_months > 0 and n_months != self._current_history_n_months
         ) or should_update:
             self._current_history_n_months = n_months
-            self.variables.history = pd.concat(
-                [
-                    self.variables.current_position.assign(month=today),
-                    *[
-                        WalletApi.get_position(d).assign(month=d)
-                        for d in self._n_previous_months(
-                            today, self._current_history_n_months
-                        )
-                    ],
-                ],
+
+            # Today and the end of each previous month
+            start = min(
+                [today, *self._n_previous_months(today, self._current_history_n_months)]
             )
+            self.variables.history = WalletApi.get_position_history(
+                start, today
+            ).rename(columns=dict(reference_date="month"))
 
             # Make all values point to end of month
             self.variables.history["month"] = (
@@ -2,7 +2,9 @@
 de configurações da carteira."""
 
 import logging
+from typing import Literal
 
+import pandas as pd
 from app.utils.state import PageState
 from app.wallet import constants
 from app.wallet.client import WalletApi
@@ -38,68 +40,71 @@ class SettingState(PageState):
                 self.variables.assets.columns,
             )
 
-        # Update transactions
-        if update_transactions or initialize:
-            self.variables.transactions = WalletApi.list_transactions().sort_values(
-                "date", ascending=False
-            )
-            logger.debug(
-                "API returned %d transactions (colums=%s).",
-                len(self.variables.transactions),
-                self.variables.transactions.columns,
-            )
-
-        # Update earnings
-        if update_earnings or initialize:
-            self.variables.earnings = WalletApi.list_earnings().sort_values(
-                "payment_date", ascending=False
-            )
-            logger.debug(
-                "API returned %d earnings (colums=%s).",
-                len(self.variables.earnings),
-                self.variables.earnings.columns,
-            )
-        # Update economic data
-        if update_economic_data or initialize:
-            self.variables.economic = WalletApi.list_economic().sort_values(
-                "reference_date", ascending=False
-            )
-            logger.debug(
-                "API returned %d economic entries (colums=%s).",
-                len(self.variables.economic),
-                self.variables.economic.columns,
-            )
-
-        # Apply filters
-        for default, st_key in zip(
-            [
-                ("Todos", constants.TransactionKinds),
-                (
-                    "Todos",
-                    constants.EarningKinds,
-                ),
-            ],
+        # Filters are applied by the API, thus only the
+        #   first page is requested after changes
+        for update, default, st_key in zip(
+            [update_transactions, update_earnings],
+            [constants.TransactionKinds, constants.EarningKinds],
             ["transaction", "earning"],
         ):
             try:
                 code = self.components[f"{st_key}_filter_code"].get()
-                kind = self.components[f"{st_key}_filter_kind"].get()
+                kinds = self.components[f"{st_key}_filter_kind"].get()
             except:
-                code, kind = default
+                code, kinds = "Todos", default
 
-            def _filter(row) -> bool:
-                return (code == "Todos" or row.asset_b3_code == code) and (
-                    row.kind in kind
-                )
+            filters = dict(
+                asset_b3_code=None if code == "Todos" else code,
+                kinds=list(kinds),
+            )
+            if (
+                update
+                or initialize
+                or filters != self.variables.get(f"{st_key}_filters")
+            ):
+                self.variables[f"{st_key}_filters"] = filters
+                self._load(f"{st_key}s")
 
-            key = f"{st_key}s"
-            filtered_key = f"filtered_{key}"
-            self.variables[filtered_key] = self.variables[key]
-            if len(self.variables[filtered_key]) > 0:
-                self.variables[filtered_key] = self.variables[filtered_key][
-                    self.variables[filtered_key].apply(_filter, axis=1)
-                ]
+        # Update economic data
+        if update_economic_data or initialize:
+            self._load("economic")
 
         # If we initialized, set flag
         if initialize:
             self.variables.initialized = True
+
+    def load_more(self, key: Literal["transactions", "earnings", "economic"]):
+        self._load(key, self.variables[f"{key}_cursor"])
+
+    def _load(
+        self,
+        key: Literal["transactions", "earnings", "economic"],
+        cursor: str = None,
+    ):
+        # Economic data isn't filtered
+        variable, list_fn, filters = dict(
+            transactions=(
+                "filtered_transactions",
+                WalletApi.list_transactions,
+                self.variables.get("transaction_filters"),
+            ),
+            earnings=(
+                "filtered_earnings",
+                WalletApi.list_earnings,
+                self.variables.get("earning_filters"),
+            ),
+            economic=("economic", WalletApi.list_economic, dict()),
+        )[key]
+
+        df, self.variables[f"{key}_cursor"] = list_fn(
+            **filters, limit=constants.ListPageSize, cursor=cursor
+        )
+        if cursor is not None:
+            df = pd.concat([self.variables[variable], df], ignore_index=True)
+        self.variables[variable] = df
+        logger.debug(
+            "API returned %d %s (colums=%s).",
+            len(df),
+            key,
+            df.columns,
+        )
@@ -1,19 +1,62 @@
 """Entrypoint do processador de YoC."""
 
+import logging
+import multiprocessing
+import multiprocessing.connection
+import sys
+
 from .config import YoCProcessorConfig
 from .processor import YoCProcessor
 
+logger = logging.getLogger(__package__)
+
 # Get configuration
 config = YoCProcessorConfig()
 
-# Create processor
-processor = YoCProcessor(
-    config.yoc_queue,
-    config.broker_url,
-    config.wallet_db_url,
-    config.analytic_db_url,
-    config.temperature,
-)
-
-# Start processor
-processor.run()
+
+def run_partition(partition: int):
+    # Create processor
+    processor = YoCProcessor(
+        config.yoc_queue,
+        config.broker_url,
+        config.wallet_db_url,
+        config.analytic_db_url,
+        config.temperature,
+        config.vectorized_threshold,
+        config.upsert_chunk_size,
+        config.economic_cache_ttl,
+        config.economic_cache_max_months,
+        config.batch_size,
+        config.batch_window,
+        partition,
+        config.yoc_partitions,
+    )
+
+    # Start processor
+    processor.run()
+
+
+if __name__ == "__main__":
+    if config.yoc_partitions <= 1:
+        run_partition(0)
+    else:
+        # One worker process per partition
+        workers = [
+            multiprocessing.Process(target=run_partition, args=(i,), name=f"yoc-{i}")
+            for i in range(config.yoc_partitions)
+        ]
+        for worker in workers:
+            worker.start()
+        logger.info("Started %d YoC processor workers.", len(workers))
+
+        # Workers run forever, if any of them stops
+        #   we stop all of them and exit with failure
+        multiprocessing.connection.wait([w.sentinel for w in workers])
+        for worker in workers:
+            if worker.exitcode is not None:
+                logger.error(
+                    "Worker %s exited with code %d.", worker.name, worker.exitcode
+                )
+            worker.terminate()
+            worker.join()
+        sys.exit(1)
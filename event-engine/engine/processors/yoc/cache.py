@@ -0,0 +1,100 @@
+"""Cache de dados econômicos do processador de YoC."""
+
+import logging
+import time
+from collections import OrderedDict
+from datetime import date
+
+import sqlalchemy as sa
+from invest_earning.database.wallet import EconomicData, EconomicIndex
+
+logger = logging.getLogger(__name__)
+
+
+class EconomicCache:
+    """Cache em memória da variação mensal dos índices
+    econômicos, indexado por `(ano, mês)`.
+
+    Todos os dados são carregados com uma única query no
+    primeiro acesso (ou após expiração do TTL). Meses
+    removidos por limite de tamanho são consultados
+    individualmente sob demanda.
+
+    Args:
+        engine: engine do banco da carteira.
+        ttl: tempo (segundos) até uma recarga completa.
+        max_months: quantidade máxima de meses armazenados.
+    """
+
+    def __init__(self, engine: sa.Engine, ttl: float, max_months: int):
+        self._engine = engine
+        self._ttl = ttl
+        self._max_months = max_months
+        self._loaded_at = None
+        self._data: OrderedDict[tuple[int, int], dict[EconomicIndex, float]] = (
+            OrderedDict()
+        )
+
+    def get(self, year: int, month: int) -> dict[EconomicIndex, float]:
+        if self._loaded_at is None or (time.monotonic() - self._loaded_at) > self._ttl:
+            self._load()
+
+        key = (year, month)
+        if key not in self._data:
+            self._data[key] = self._load_month(year, month)
+            self._evict()
+        self._data.move_to_end(key)
+
+        return self._data[key]
+
+    def invalidate(self, year: int = None, month: int = None):
+        # Invalidate everything, next access reloads
+        if year is None:
+            logger.debug("Invalidating whole economic cache.")
+            self._data.clear()
+            self._loaded_at = None
+            return
+
+        logger.debug("Invalidating economic cache for %04d-%02d.", year, month)
+        self._data.pop((year, month), None)
+
+    def _load(self):
+        self._data.clear()
+        with sa.orm.Session(self._engine) as session:
+            rows = session.execute(
+                sa.select(
+                    EconomicData.index,
+                    EconomicData.reference_date,
+                    EconomicData.percentage_change,
+                ).order_by(EconomicData.reference_date)
+            ).all()
+
+        for index, reference_date, percentage_change in rows:
+            key = (reference_date.year, reference_date.month)
+            self._data.setdefault(key, dict())[index] = percentage_change
+
+        self._evict()
+        self._loaded_at = time.monotonic()
+        logger.debug(
+            "Loaded %d economic entries into cache (%d months).",
+            len(rows),
+            len(self._data),
+        )
+
+    def _load_month(self, year: int, month: int) -> dict[EconomicIndex, float]:
+        start = date(year, month, 1)
+        end = date(year + month // 12, month % 12 + 1, 1)
+        with sa.orm.Session(self._engine) as session:
+            rows = session.execute(
+                sa.select(EconomicData.index, EconomicData.percentage_change)
+                .where(EconomicData.reference_date >= start)
+                .where(EconomicData.reference_date < end)
+                .order_by(EconomicData.reference_date)
+            ).all()
+
+        return {index: percentage_change for index, percentage_change in rows}
+
+    def _evict(self):
+        # Least recently used months are evicted first
+        while len(self._data) > self._max_months:
+            self._data.popitem(last=False)
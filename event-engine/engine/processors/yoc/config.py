@@ -9,3 +9,10 @@ class YoCProcessorConfig(BaseSettings):
     wallet_db_url: str = "sqlite:///wallet.db"
     analytic_db_url: str = "sqlite:///analytic.db"
     temperature: float = 0.25
+    vectorized_threshold: int = 500
+    upsert_chunk_size: int = 1000
+    economic_cache_ttl: float = 3600.0
+    economic_cache_max_months: int = 1200
+    batch_size: int = 1000
+    batch_window: float = 1.0
+    yoc_partitions: int = 1
@@ -1,12 +1,17 @@
 """Processador de Yield On Cost (YoC)."""
 
+import itertools
 import json
 import logging
 import random
-from datetime import date, datetime
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date
 
 import pika
 import sqlalchemy as sa
+import sqlalchemy.dialects.postgresql
+import sqlalchemy.dialects.sqlite
 from engine.utils.messages import (
     AnalyticEvent,
     AnalyticTrigger,
@@ -15,17 +20,41 @@ from engine.utils.messages import (
     WalletEntity,
     WalletUpdateInformation,
 )
-from invest_earning.database.analytic import EarningYield
+from engine.utils.partition import partition_of, partition_queue
+from invest_earning.database.analytic import AnalyticWatermark, EarningYield
 from invest_earning.database.wallet import (
     Earning,
-    EconomicData,
     EconomicIndex,
     Position,
     Transaction,
+    TransactionKind,
+    WalletVersion,
 )
 
+from . import vectorized
+from .cache import EconomicCache
+
 logger = logging.getLogger(__name__)
 
+# Wallet tables that affect the EarningYield
+_WATCHED_TABLES = ["asset", "earning", "transaction", "economic_data"]
+
+# Maximum number of bind parameters per statement
+_MAX_BIND_PARAMETERS = dict(postgresql=65535, sqlite=32766)
+
+# Maximum number of ids bound in a single IN/NOT IN clause,
+#   one parameter per id
+_MAX_IN_CLAUSE_IDS = min(_MAX_BIND_PARAMETERS.values())
+
+
+@dataclass
+class _PendingWork:
+    """Trabalho acumulado por um lote de eventos."""
+
+    earnings: set[int] = field(default_factory=set)
+    drop_earnings: set[int] = field(default_factory=set)
+    drop_assets: set[str] = field(default_factory=set)
+
 
 class YoCProcessor:
     def __init__(
@@ -35,15 +64,37 @@ class YoCProcessor:
         wallet_db_url: str,
         analytic_db_url: str,
         temperature: float,
+        vectorized_threshold: int = 500,
+        upsert_chunk_size: int = 1000,
+        economic_cache_ttl: float = 3600.0,
+        economic_cache_max_months: int = 1200,
+        batch_size: int = 1000,
+        batch_window: float = 1.0,
+        partition: int = 0,
+        partitions: int = 1,
     ):
         self._conn, self._ch = None, None
         self._wallet_engine = None
         self._analytic_engine = None
+        self._economic = None
         self._broker_url = broker_url
-        self._queue = queue
+        self._queue = partition_queue(queue, partition, partitions)
         self._wallet_url = wallet_db_url
         self._analytic_url = analytic_db_url
         self._t = temperature
+        self._vectorized_threshold = vectorized_threshold
+        self._upsert_chunk_size = upsert_chunk_size
+        self._economic_cache_ttl = economic_cache_ttl
+        self._economic_cache_max_months = economic_cache_max_months
+        self._batch_size = batch_size
+        self._batch_window = batch_window
+        self._pending: list[tuple[int, AnalyticEvent | None]] = []
+        self._flush_timer = None
+        self._partition = partition
+        self._partitions = partitions
+        self._watermark_key = (
+            "yoc" if partitions <= 1 else f"yoc.{partition}.{partitions}"
+        )
 
         if self._t > 0:
             logger.info(
@@ -73,9 +124,15 @@ class YoCProcessor:
         self._ch = self._conn.channel()
         self._wallet_engine = sa.create_engine(self._wallet_url)
         self._analytic_engine = sa.create_engine(self._analytic_url)
+        self._economic = EconomicCache(
+            self._wallet_engine,
+            self._economic_cache_ttl,
+            self._economic_cache_max_months,
+        )
 
         # Setup broker queue
         self._ch.queue_declare(queue=self._queue, durable=True)
+        self._ch.basic_qos(prefetch_count=self._batch_size)
         self._ch.basic_consume(self._queue, self._on_notification, auto_ack=False)
 
     def _stop_connections(self):
@@ -95,28 +152,92 @@ class YoCProcessor:
         header_frame: pika.spec.BasicProperties,
         body: bytes,
     ):
+        event = None
         if header_frame.content_type == "application/json":
             event = AnalyticEvent(
                 **json.loads(body.decode(header_frame.content_encoding))
             )
-            logger.info("Procesing event:\n%s", event.model_dump_json(indent=2))
+            logger.info("Received event:\n%s", event.model_dump_json(indent=2))
 
-            # Select processing function
+        # Hold event until the batch is full or the
+        #   window elapses without new messages
+        self._pending.append((method_frame.delivery_tag, event))
+        if self._flush_timer is not None:
+            self._conn.remove_timeout(self._flush_timer)
+            self._flush_timer = None
+
+        if len(self._pending) >= self._batch_size:
+            self._flush()
+        else:
+            self._flush_timer = self._conn.call_later(self._batch_window, self._flush)
+
+    def _flush(self):
+        if self._flush_timer is not None:
+            self._conn.remove_timeout(self._flush_timer)
+            self._flush_timer = None
+
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+
+        logger.info("Procesing batch of %d events.", len(pending))
+        self._process_events([event for _, event in pending if event is not None])
+
+        # Work has been done, ack every message up to the last one
+        self._ch.basic_ack(delivery_tag=pending[-1][0], multiple=True)
+
+    def _process_events(self, events: list[AnalyticEvent]):
+        work, dashboard_query = _PendingWork(), None
+        for event in events:
             match event.trigger:
                 case AnalyticTrigger.wallet_update:
-                    self._process_wallet_update(event.update_information)
+                    self._process_wallet_update(event.update_information, work)
                 case AnalyticTrigger.dashboard_query:
-                    self._process_dashboard_query(event.query_information)
+                    # Dashboard queries are idempotent, keep only the last one
+                    dashboard_query = event.query_information
+
+        # Drop yields of removed entities first
+        if work.drop_assets:
+            self._drop_earning_yield_in(EarningYield.b3_code, sorted(work.drop_assets))
+        if work.drop_earnings:
+            self._drop_earning_yield_in(
+                EarningYield.earning_id, sorted(work.drop_earnings)
+            )
 
-        # Work has been done
-        channel.basic_ack(delivery_tag=method_frame.delivery_tag)
+        # Then, recompute all affected earnings at once
+        earnings_ids = sorted(work.earnings - work.drop_earnings)
+        if earnings_ids:
+            logger.debug(
+                "Updating yield for %d earnings affected by batch.",
+                len(earnings_ids),
+            )
+            self._create_or_update_multiple(earnings_ids)
 
-    def _process_wallet_update(self, event: WalletUpdateInformation):
+        if dashboard_query is not None:
+            self._process_dashboard_query(dashboard_query)
+
+    def _process_wallet_update(
+        self, event: WalletUpdateInformation, work: "_PendingWork"
+    ):
         # Preprocessing of known instances of id formats
         try:
-            int_event_id = int(event.entity_id)
+            int_event_ids = [int(i) for i in event.entity_ids]
         except Exception:
-            int_event_id = None
+            int_event_ids = None
+
+        # Earnings and transactions are identified by integers, malformed
+        #   ids are skipped (and acked along with the batch), otherwise
+        #   the message would be redelivered forever
+        if int_event_ids is None and event.entity in {
+            WalletEntity.earning,
+            WalletEntity.transaction,
+        }:
+            logger.warning(
+                "Unknown format for %s ID: '%s'. Ignored event.",
+                event.entity.value,
+                event.entity_id,
+            )
+            return
 
         # Pattern matching
         match (event.operation, event.entity):
@@ -126,14 +247,15 @@ class YoCProcessor:
                 WalletEntity.earning,
             ):
                 logger.debug(
-                    "Updating yield entry for earning with id %d.", int_event_id
+                    "Scheduling yield update for %d earning(s).", len(int_event_ids)
                 )
-                self._create_or_update_earning_yield(int_event_id)
+                work.earnings.update(int_event_ids)
             case (DatabaseOperation.DELETED, WalletEntity.earning):
                 logger.debug(
-                    "Dropping all earning yields entries where earning_id == %d.",
+                    "Scheduling drop of earning yields for %d earning(s).",
+                    len(int_event_ids),
                 )
-                self._drop_earning_yield_where(EarningYield.earning_id == int_event_id)
+                work.drop_earnings.update(int_event_ids)
 
             # Transaction
             case (
@@ -141,20 +263,21 @@ class YoCProcessor:
                 WalletEntity.transaction,
             ):
                 logger.debug(
-                    "Bulk updating yield affected by transaction with id %d.",
-                    int_event_id,
+                    "Scheduling yield update for earnings affected by "
+                    "%d transaction(s).",
+                    len(int_event_ids),
                 )
-                self._create_or_update_multiple(
-                    self._get_earnings_affected_by_transaction(int_event_id)
+                work.earnings.update(
+                    self._get_earnings_affected_by_transactions(int_event_ids)
                 )
             case (DatabaseOperation.DELETED, WalletEntity.transaction):
-                if event.reference == WalletEntity.earning:
+                if event.reference == WalletEntity.asset:
                     logger.debug(
-                        "Bulk updating yield affected by deletion of "
-                        "transaction for asset %s.",
+                        "Scheduling yield update for earnings affected by "
+                        "deletion of transaction for asset %s.",
                         event.reference_id,
                     )
-                    self._create_or_update_multiple(
+                    work.earnings.update(
                         self._get_earnings_affected_by_asset(event.reference_id)
                     )
                 else:
@@ -168,68 +291,125 @@ class YoCProcessor:
             # Economic data
             case (_, WalletEntity.economic_data):
                 # EconomicData has composite key of form `index`_`date`
-                splits = event.entity_id.split("_", maxsplit=1)
-                if len(splits) == 2:
-                    e_index = EconomicIndex.from_value(splits[0])
-                    ref_date = datetime.strptime(splits[1], "%Y_%m_%d").date()
-                    self._create_or_update_multiple(
-                        self._get_earnings_affected_by_economic(e_index, ref_date)
-                    )
-                else:
-                    logger.warning(
-                        "Unknown format for EconomicData " "ID: '%s'. Ignored event.",
-                        event.entity_id,
-                    )
+                #   and batch notifications cover multiple months
+                months = set()
+                for entity_id in event.entity_ids:
+                    try:
+                        index, year, month, _ = entity_id.rsplit("_", maxsplit=3)
+                        index = EconomicIndex.from_value(index)
+                        year, month = int(year), int(month)
+                    except Exception:
+                        logger.warning(
+                            "Unknown format for EconomicData ID: '%s'. Ignored.",
+                            entity_id,
+                        )
+                        continue
+
+                    # EarningYield only uses those indices
+                    if index in {EconomicIndex.cdi, EconomicIndex.ipca}:
+                        months.add((year, month))
+
+                # Each affected month is recomputed once
+                for year, month in months:
+                    self._economic.invalidate(year, month)
+                logger.debug(
+                    "Scheduling yield update for earnings affected by "
+                    "%d month(s) of economic data.",
+                    len(months),
+                )
+                work.earnings.update(self._get_earnings_affected_by_economic(months))
 
             # Asset
             case (DatabaseOperation.DELETED, WalletEntity.asset):
-                self._drop_earning_yield_where(EarningYield.b3_code == event.entity_id)
+                work.drop_assets.add(event.entity_id)
 
     def _process_dashboard_query(self, event: QueryInformation):
-        # TODO: improve checking and message processing
-        n_earnings = self._earnings_count()
-        n_yield = self._earning_yield_count()
-        has_missing_yield = n_yield < n_earnings
+        # Single-row comparison between the wallet version
+        #   and the version reflected on the analytics
+        version = self._wallet_version()
+        watermark = self._analytic_watermark()
+        is_stale = watermark is None or watermark != version
         should_random_update = random.random() > (1 - self._t)
 
-        if has_missing_yield or should_random_update:
-            earnings_ids = self._all_earnings_ids()
-            if has_missing_yield:
-                logger.debug(
-                    "n_yield (%d) < n_earnings (%d), running analysis "
-                    "for all earnings (%d).",
-                    n_yield,
-                    n_earnings,
-                    len(earnings_ids),
-                )
-            else:
-                logger.debug(
-                    "Random update triggered by RNG. "
-                    "Running analyis for %d earnings.",
-                    len(earnings_ids),
-                )
+        if should_random_update:
+            earnings = self._all_earnings()
+            owned = [i for i, b3_code in earnings.items() if self._owns(b3_code)]
+            logger.debug(
+                "Random update triggered by RNG. Running analyis for %d earnings.",
+                len(owned),
+            )
             # First drop possibly missing ids (prune)
-            self._drop_earning_yield_where(EarningYield.earning_id.not_in(earnings_ids))
+            self._drop_earning_yield_not_in(list(earnings))
+
+            # Then, create or update all of them
+            self._create_or_update_vectorized(None if self._partitions <= 1 else owned)
+        elif is_stale:
+            # Id-only anti-join between wallet and analytics
+            earnings = self._all_earnings()
+            earnings_ids = set(earnings)
+            yield_ids = set(self._all_earning_yield_ids())
+            missing = sorted(
+                i for i in earnings_ids - yield_ids if self._owns(earnings[i])
+            )
+            logger.debug(
+                "Wallet version (%d) differs from watermark (%s), running "
+                "analysis for %d missing earnings.",
+                version,
+                watermark,
+                len(missing),
+            )
 
-            # Then, create or update existing ones
-            self._create_or_update_multiple(earnings_ids)
+            # First drop yields of removed earnings (prune)
+            if yield_ids - earnings_ids:
+                self._drop_earning_yield_not_in(list(earnings_ids))
+
+            # Then, create the missing ones
+            if missing:
+                self._create_or_update_multiple(missing)
         else:
             logger.debug(
-                "Database has yield for all earnings and "
+                "Analytics reflect current wallet version and "
                 "no random update triggered. Skipping."
             )
+            return
 
-    def _all_earnings_ids(self) -> list[int]:
+        # Analytics now reflect (at least) the version read before processing
+        self._record_watermark(version)
+
+    def _wallet_version(self) -> int:
         with sa.orm.Session(self._wallet_engine) as session:
-            return [e.id for e in session.query(Earning).all()]
+            return WalletVersion.get(session, _WATCHED_TABLES)
+
+    def _analytic_watermark(self) -> int | None:
+        with sa.orm.Session(self._analytic_engine) as session:
+            return session.scalar(
+                sa.select(AnalyticWatermark.wallet_version).where(
+                    AnalyticWatermark.processor == self._watermark_key
+                )
+            )
+
+    def _record_watermark(self, version: int):
+        with sa.orm.Session(self._analytic_engine) as session:
+            session.merge(
+                AnalyticWatermark(processor=self._watermark_key, wallet_version=version)
+            )
+            session.commit()
+
+    def _owns(self, b3_code: str) -> bool:
+        return (
+            self._partitions <= 1
+            or partition_of(b3_code, self._partitions) == self._partition
+        )
 
-    def _earnings_count(self) -> int:
+    def _all_earnings(self) -> dict[int, str]:
         with sa.orm.Session(self._wallet_engine) as session:
-            return session.query(Earning).count()
+            return dict(
+                session.execute(sa.select(Earning.id, Earning.asset_b3_code)).all()
+            )
 
-    def _earning_yield_count(self) -> int:
+    def _all_earning_yield_ids(self) -> list[int]:
         with sa.orm.Session(self._analytic_engine) as session:
-            return session.query(EarningYield).count()
+            return list(session.scalars(sa.select(EarningYield.earning_id)))
 
     def _get_earnings_affected_by_asset(self, b3_code: str):
         with sa.orm.Session(self._analytic_engine) as analytic_session:
@@ -241,159 +421,237 @@ class YoCProcessor:
             ]
 
     def _get_earnings_affected_by_economic(
-        self, index: EconomicIndex, reference_date: date
+        self, months: set[tuple[int, int]]
     ) -> list[int]:
-        # EarningYield only uses those indices
-        if index not in {EconomicIndex.cdi, EconomicIndex.ipca}:
+        if not months:
             return []
 
-        # We must find which EarningYield rows are affected
+        # We must find which EarningYield rows are affected,
+        #   consecutive months are merged into range predicates
+        #   over hold_date (which allow index usage)
+        ranges = []
+        for year, month in sorted(months):
+            start = date(year, month, 1)
+            end = date(year + month // 12, month % 12 + 1, 1)
+            if ranges and ranges[-1][1] == start:
+                ranges[-1][1] = end
+            else:
+                ranges.append([start, end])
+
         with sa.orm.Session(self._analytic_engine) as analytic_session:
             return [
-                ey.earning_id
-                for ey in analytic_session.query(EarningYield)
-                .where(
-                    sa.extract("year", EarningYield.hold_date) == reference_date.year
-                )
-                .where(
-                    sa.extract("month", EarningYield.hold_date) == reference_date.month
+                earning_id
+                for earning_id, b3_code in analytic_session.execute(
+                    sa.select(EarningYield.earning_id, EarningYield.b3_code).where(
+                        sa.or_(
+                            *[
+                                sa.and_(
+                                    EarningYield.hold_date >= start,
+                                    EarningYield.hold_date < end,
+                                )
+                                for start, end in ranges
+                            ]
+                        )
+                    )
                 )
-                .all()
+                if self._owns(b3_code)
             ]
 
-    def _get_earnings_affected_by_transaction(
+    def _get_earnings_affected_by_transactions(
         self,
-        transaction_id: int,
+        transaction_ids: list[int],
     ) -> list[int]:
+        # Earnings held on or after the transaction are affected
         with sa.orm.Session(self._wallet_engine) as wallet_session:
-            transaction: Transaction = (
-                wallet_session.query(Transaction)
-                .options(sa.orm.selectinload(Transaction.entitled_to_earnings))
-                .where(Transaction.id == transaction_id)
-                .one_or_none()
-            )
-
-            return (
-                list(set(e.id for e in transaction.entitled_to_earnings))
-                if transaction
-                else []
+            return list(
+                wallet_session.scalars(
+                    sa.select(Earning.id)
+                    .join(
+                        Transaction,
+                        sa.and_(
+                            Transaction.asset_b3_code == Earning.asset_b3_code,
+                            Earning.hold_date >= Transaction.date,
+                        ),
+                    )
+                    .where(Transaction.id.in_(transaction_ids))
+                    .distinct()
+                )
             )
 
     def _create_or_update_multiple(self, earnings_ids: list[int]):
+        # Large updates are better served by the vectorized engine
+        if len(earnings_ids) >= self._vectorized_threshold:
+            self._create_or_update_vectorized(earnings_ids)
+            return
+
         # Create sessions to group all changes into single transaction
         wsession = sa.orm.Session(self._wallet_engine, expire_on_commit=False)
         asession = sa.orm.Session(self._analytic_engine)
 
+        # Load all affected earnings and find the position
+        #   on every required hold date in a single sweep
+        earnings = self._get_earnings(wsession, earnings_ids)
+        positions = self._get_positions_on_hold_dates(wsession, earnings)
+
         # For each affected earning, update
         logger.debug(
-            "Processing %d affected earnings by creating or "
+            "Processing %d affected earnings (%d positions) by creating or "
             "updating earning yield entry for each one.",
-            len(earnings_ids),
+            len(earnings),
+            len(positions),
         )
-        for earning_id in earnings_ids:
-            self._create_or_update_earning_yield(
-                earning_id,
+        rows = [
+            self._compute_earning_yield(
+                earning.id,
                 wallet_session=wsession,
-                analytic_session=asession,
+                earning=earning,
+                position=positions.get(
+                    (earning.asset_b3_code, earning.hold_date), (0, 0.0)
+                ),
             )
+            for earning in earnings
+        ]
+        wsession.close()
 
         # Commit changes and close sessions
         logger.debug("Commiting changes of affected earnings to database.")
-        wsession.close()
+        self._upsert_earning_yield(asession, rows)
         asession.commit()
         asession.close()
 
-    def _create_or_update_earning_yield(
-        self,
-        earning_id: int,
-        wallet_session: sa.orm.Session = None,
-        analytic_session: sa.orm.Session = None,
-    ):
-        assert (wallet_session is None) == (analytic_session is None)
-        should_manage = wallet_session is None
+    def _get_earnings(
+        self, wallet_session: sa.orm.Session, earnings_ids: list[int]
+    ) -> list[Earning]:
+        # Query in chunks to respect the maximum
+        #   number of parameters in a statement
+        earnings_ids, chunk, earnings = list(set(earnings_ids)), 1000, []
+        for i in range(0, len(earnings_ids), chunk):
+            earnings.extend(
+                wallet_session.query(Earning)
+                .options(sa.orm.selectinload(Earning.asset))
+                .where(Earning.id.in_(earnings_ids[i : i + chunk]))
+                .all()
+            )
 
-        if should_manage:
-            wallet_session = sa.orm.Session(self._wallet_engine, expire_on_commit=False)
-            analytic_session = sa.orm.Session(self._analytic_engine)
+        return earnings
+
+    def _get_positions_on_hold_dates(
+        self, wallet_session: sa.orm.Session, earnings: list[Earning]
+    ) -> dict[tuple[str, date], tuple[int, float]]:
+        """Calcula a posição (unidades, preço médio) de cada ativo
+        em cada data de custódia dos proventos através de uma única
+        varredura nas transações ordenadas por data.
+
+        Segue a mesma semântica de `Position.get`, posições sem
+        unidades não são retornadas.
+        """
+        # Find required hold dates for each asset
+        hold_dates = defaultdict(set)
+        for e in earnings:
+            hold_dates[e.asset_b3_code].add(e.hold_date)
+
+        if not hold_dates:
+            return dict()
+
+        # Transactions of all affected assets sorted by date
+        rows = wallet_session.execute(
+            sa.select(
+                Transaction.asset_b3_code,
+                Transaction.date,
+                Transaction.kind,
+                Transaction.shares,
+                Transaction.value_per_share,
+            )
+            .where(Transaction.asset_b3_code.in_(list(hold_dates)))
+            .where(Transaction.date <= max(max(d) for d in hold_dates.values()))
+            .order_by(Transaction.asset_b3_code, Transaction.date)
+        ).all()
+        transactions = {
+            k: list(v) for k, v in itertools.groupby(rows, key=lambda r: r[0])
+        }
+
+        # Sweep transactions with running totals, stopping
+        #   at each hold date
+        positions = dict()
+        for b3_code, dates in hold_dates.items():
+            txs = transactions.get(b3_code, [])
+            buy, sell, total_buy, i = 0, 0, 0.0, 0
+            for hold_date in sorted(dates):
+                while i < len(txs) and txs[i].date <= hold_date:
+                    t = txs[i]
+                    if t.kind == TransactionKind.buy:
+                        buy += t.shares
+                        total_buy += t.value_per_share * t.shares
+                    else:
+                        sell += t.shares
+                    i += 1
+
+                if buy - sell > 0:
+                    positions[(b3_code, hold_date)] = (buy - sell, total_buy / buy)
+
+        return positions
+
+    def _create_or_update_earning_yield(self, earning_id: int):
+        with sa.orm.Session(self._wallet_engine) as wallet_session:
+            data = self._compute_earning_yield(earning_id, wallet_session)
+
+        with sa.orm.Session(self._analytic_engine) as analytic_session:
+            self._upsert_earning_yield(analytic_session, [data])
+            analytic_session.commit()
 
+    def _compute_earning_yield(
+        self,
+        earning_id: int,
+        wallet_session: sa.orm.Session,
+        earning: Earning = None,
+        position: tuple[int, float] = None,
+    ) -> dict:
         # Data about the earning is required for the yield
-        earning: Earning = (
-            wallet_session.query(Earning)
-            .options(sa.orm.selectinload(Earning.asset))
-            .where(Earning.id == earning_id)
-            .one()
-        )
+        if earning is None:
+            earning = (
+                wallet_session.query(Earning)
+                .options(sa.orm.selectinload(Earning.asset))
+                .where(Earning.id == earning_id)
+                .one()
+            )
+
+        # Position (shares, avg_price) is required for yield. There
+        #   might be cases where the user doesn't hold any shares for
+        #   the asset, in such cases a default position of 0 is used.
+        if position is None:
+            position = next(
+                (
+                    (p.shares, p.avg_price)
+                    for p in Position.get(
+                        session=wallet_session,
+                        reference_date=earning.hold_date,
+                        b3_codes=[earning.asset_b3_code],
+                    )
+                    if p.b3_code == earning.asset_b3_code
+                ),
+                (0, 0.0),
+            )
 
-        # Position is required for yield. There might be cases
-        #   where the user doesn't hold any shares for the asset,
-        #   in such cases a default position of 0 is returned.
-        def _get_default() -> Position:
+        shares, avg_price = position
+        if shares <= 0:
             logger.debug(
                 "No shares found for asset %s on earning %d. "
                 "Yield will contain zero data.",
                 earning.asset_b3_code,
                 earning.id,
             )
-            return Position(
-                b3_code=earning.asset_b3_code,
-                shares=0,
-                avg_price=0.0,
-                total_invested=0.0,
-                asset_kind=earning.asset.kind,
-                current_price=0.0,
-                balance=0.0,
-                total_earnings=0.0,
-                total_ir_adjusted_earnings=0.0,
-                yield_on_cost=0.0,
-                rate_of_return=0.0,
-            )
-
-        try:
-            position = next(
-                p
-                for p in Position.get(
-                    session=wallet_session, reference_date=earning.hold_date
-                )
-                if p.b3_code == earning.asset_b3_code
-            )
-        except StopIteration:
-            position = _get_default()
 
         # Economic data is also needed
-        economic = (
-            wallet_session.query(EconomicData)
-            .where(
-                sa.extract("year", EconomicData.reference_date)
-                == sa.extract("year", earning.hold_date)
-            )
-            .where(
-                sa.extract("month", EconomicData.reference_date)
-                == sa.extract("month", earning.hold_date)
-            )
-            .all()
-        )
-
-        # Maybe close session
-        if should_manage:
-            wallet_session.close()
+        economic = self._economic.get(earning.hold_date.year, earning.hold_date.month)
 
         # Compute required fields for earning yield
-        cdi_on_hold_month = 0.0
-        ipca_on_hold_month = 0.0
-        for e in economic:
-            v = e.percentage_change
-            match e.index:
-                case EconomicIndex.cdi:
-                    cdi_on_hold_month = v
-                case EconomicIndex.ipca:
-                    ipca_on_hold_month = v
-                case _:
-                    continue
+        cdi_on_hold_month = economic.get(EconomicIndex.cdi, 0.0)
+        ipca_on_hold_month = economic.get(EconomicIndex.ipca, 0.0)
 
         ir_adjusted_value_per_share = (
             1 - (earning.ir_percentage / 100)
         ) * earning.value_per_share
-        data = dict(
+        return dict(
             b3_code=earning.asset_b3_code,
             asset_kind=earning.asset.kind,
             earning_id=earning.id,
@@ -403,48 +661,155 @@ class YoCProcessor:
             ir=earning.ir_percentage,
             value_per_share=earning.value_per_share,
             ir_adjusted_value_per_share=ir_adjusted_value_per_share,
-            shares=position.shares,
-            avg_price=position.avg_price,
-            total_earnings=position.shares * ir_adjusted_value_per_share,
+            shares=shares,
+            avg_price=avg_price,
+            total_earnings=shares * ir_adjusted_value_per_share,
             yoc=(
-                (100 * (ir_adjusted_value_per_share / position.avg_price))
-                if position.shares > 0
-                else 0.0
+                (100 * (ir_adjusted_value_per_share / avg_price)) if shares > 0 else 0.0
             ),
             cdi_on_hold_month=cdi_on_hold_month,
             ipca_on_hold_month=ipca_on_hold_month,
         )
 
-        # Check if object already exists
-        earning_yield = analytic_session.get(EarningYield, earning_id)
+    def _create_or_update_vectorized(self, earnings_ids: list[int] = None):
+        # Load all required data as DataFrames
+        with sa.orm.Session(self._wallet_engine) as wallet_session:
+            earnings, transactions, economic = vectorized.load_frames(
+                wallet_session, earnings_ids
+            )
 
-        # If it exists, simply update
-        if earning_yield is not None:
-            for k, v in data.items():
-                setattr(earning_yield, k, v)
-        else:
-            # Otherwise, create new one
-            analytic_session.add(EarningYield(**data))
+        # Compute every earning yield at once
+        logger.debug(
+            "Running vectorized analysis for %d earnings (%d transactions).",
+            len(earnings),
+            len(transactions),
+        )
+        df = vectorized.compute_earning_yield(earnings, transactions, economic)
 
-        # Save state (if it exists, will be updated)
-        if should_manage:
+        # Persist results
+        with sa.orm.Session(self._analytic_engine) as analytic_session:
+            logger.debug("Commiting changes of affected earnings to database.")
+            self._upsert_earning_yield(analytic_session, df.to_dict(orient="records"))
             analytic_session.commit()
-            analytic_session.close()
+
+    def _upsert_earning_yield(self, analytic_session: sa.orm.Session, rows: list[dict]):
+        # Select dialect-specific INSERT with ON CONFLICT support
+        dialect = analytic_session.get_bind().dialect.name
+        match dialect:
+            case "postgresql":
+                insert = sa.dialects.postgresql.insert
+            case "sqlite":
+                insert = sa.dialects.sqlite.insert
+            case _:
+                insert = None
+
+        # Fallback to ORM for other dialects
+        if insert is None:
+            logger.warning(
+                "Dialect '%s' has no bulk upsert support, "
+                "falling back to ORM merges.",
+                dialect,
+            )
+            for data in rows:
+                analytic_session.merge(EarningYield(**data))
+            return
+
+        # Multi-row INSERT ... ON CONFLICT DO UPDATE in chunks, each
+        #   row binds one parameter per column
+        chunk_size = min(
+            self._upsert_chunk_size,
+            _MAX_BIND_PARAMETERS[dialect] // len(EarningYield.__table__.columns),
+        )
+        for i in range(0, len(rows), chunk_size):
+            stmt = insert(EarningYield).values(rows[i : i + chunk_size])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[EarningYield.earning_id],
+                set_={
+                    c.name: stmt.excluded[c.name]
+                    for c in EarningYield.__table__.columns
+                    if not c.primary_key
+                },
+            )
+            analytic_session.execute(stmt)
+
+        logger.debug(
+            "Upserted %d rows of EarningYield in %d statements.",
+            len(rows),
+            -(-len(rows) // chunk_size),
+        )
 
     def _drop_earning_yield_where(
         self,
         clause,
         analytic_session: sa.orm.Session = None,
-    ):
+    ) -> int:
         should_manage = analytic_session is None
         if should_manage:
             analytic_session = sa.orm.Session(self._analytic_engine)
 
-        objects = analytic_session.query(EarningYield).where(clause).all()
-        for obj in objects:
-            analytic_session.delete(obj)
+        # Single server-side DELETE, no objects are loaded
+        result = analytic_session.execute(
+            sa.delete(EarningYield)
+            .where(clause)
+            .execution_options(synchronize_session=False)
+        )
 
-        logger.debug("Marked %d rows of EarningYield to deletion.", len(objects))
+        logger.debug("Deleted %d rows of EarningYield.", result.rowcount)
         if should_manage:
             analytic_session.commit()
             analytic_session.close()
+
+        return result.rowcount
+
+    def _drop_earning_yield_in(self, column, values: list) -> int:
+        # Query in chunks to respect the maximum number
+        #   of parameters in a statement, all chunks are
+        #   deleted in the same transaction
+        with sa.orm.Session(self._analytic_engine) as analytic_session:
+            count = sum(
+                self._drop_earning_yield_where(
+                    column.in_(values[i : i + _MAX_IN_CLAUSE_IDS]),
+                    analytic_session=analytic_session,
+                )
+                for i in range(0, len(values), _MAX_IN_CLAUSE_IDS)
+            )
+            analytic_session.commit()
+
+        return count
+
+    def _drop_earning_yield_not_in(self, earnings_ids: list[int]) -> int:
+        # Small lists fit into a single NOT IN clause
+        if len(earnings_ids) <= _MAX_IN_CLAUSE_IDS:
+            return self._drop_earning_yield_where(
+                EarningYield.earning_id.not_in(earnings_ids)
+            )
+
+        # Otherwise, load ids into a temporary table and
+        #   delete through an anti-join
+        keep = sa.Table(
+            "keep_earning_ids",
+            sa.MetaData(),
+            sa.Column(
+                "earning_id", sa.BigInteger, primary_key=True, autoincrement=False
+            ),
+            prefixes=["TEMPORARY"],
+        )
+        with sa.orm.Session(self._analytic_engine) as analytic_session:
+            conn = analytic_session.connection()
+            keep.create(conn)
+            for i in range(0, len(earnings_ids), _MAX_IN_CLAUSE_IDS):
+                conn.execute(
+                    sa.insert(keep),
+                    [
+                        dict(earning_id=earning_id)
+                        for earning_id in earnings_ids[i : i + _MAX_IN_CLAUSE_IDS]
+                    ],
+                )
+            count = self._drop_earning_yield_where(
+                ~sa.exists().where(keep.c.earning_id == EarningYield.earning_id),
+                analytic_session=analytic_session,
+            )
+            keep.drop(conn)
+            analytic_session.commit()
+
+        return count
@@ -0,0 +1,208 @@
+"""Cálculo vetorizado do YoC.
+
+Carrega proventos, transações e dados econômicos
+como DataFrames e calcula todas as colunas do
+`EarningYield` de forma colunar.
+"""
+
+import numpy as np
+import pandas as pd
+import sqlalchemy as sa
+from invest_earning.database.wallet import (
+    Asset,
+    Earning,
+    EconomicData,
+    EconomicIndex,
+    Transaction,
+    TransactionKind,
+)
+
+EARNING_COLUMNS = [
+    "earning_id",
+    "b3_code",
+    "asset_kind",
+    "earning_kind",
+    "hold_date",
+    "payment_date",
+    "ir",
+    "value_per_share",
+]
+TRANSACTION_COLUMNS = ["b3_code", "date", "kind", "shares", "value_per_share"]
+ECONOMIC_COLUMNS = ["index", "reference_date", "percentage_change"]
+
+
+def load_frames(
+    session: sa.orm.Session, earnings_ids: list[int] | None = None
+) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """Carrega os dados necessários para o cálculo do YoC.
+
+    Args:
+        session: sessão com o banco da carteira.
+        earnings_ids: proventos que devem ser carregados. Se
+            `None`, todos os proventos são carregados.
+
+    Returns:
+        tuple: DataFrames de proventos, transações
+            e dados econômicos.
+    """
+    query = sa.select(
+        Earning.id,
+        Earning.asset_b3_code,
+        Asset.kind,
+        Earning.kind,
+        Earning.hold_date,
+        Earning.payment_date,
+        Earning.ir_percentage,
+        Earning.value_per_share,
+    ).join(Asset, Asset.b3_code == Earning.asset_b3_code)
+
+    # Query in chunks to respect the maximum
+    #   number of parameters in a statement
+    if earnings_ids is None:
+        rows = session.execute(query).all()
+    else:
+        earnings_ids, chunk, rows = list(set(earnings_ids)), 1000, []
+        for i in range(0, len(earnings_ids), chunk):
+            rows.extend(
+                session.execute(
+                    query.where(Earning.id.in_(earnings_ids[i : i + chunk]))
+                ).all()
+            )
+    earnings = pd.DataFrame(rows, columns=EARNING_COLUMNS)
+
+    # Only transactions that might affect the earnings
+    query = sa.select(
+        Transaction.asset_b3_code,
+        Transaction.date,
+        Transaction.kind,
+        Transaction.shares,
+        Transaction.value_per_share,
+    )
+    if earnings_ids is not None:
+        query = query.where(
+            Transaction.asset_b3_code.in_(earnings.b3_code.unique().tolist())
+        )
+    if len(earnings) > 0:
+        query = query.where(Transaction.date <= earnings.hold_date.max())
+    transactions = pd.DataFrame(
+        session.execute(query).all(), columns=TRANSACTION_COLUMNS
+    )
+
+    # Economic data is small, always load everything
+    economic = pd.DataFrame(
+        session.execute(
+            sa.select(
+                EconomicData.index,
+                EconomicData.reference_date,
+                EconomicData.percentage_change,
+            ).where(EconomicData.index.in_([EconomicIndex.cdi, EconomicIndex.ipca]))
+        ).all(),
+        columns=ECONOMIC_COLUMNS,
+    )
+
+    return earnings, transactions, economic
+
+
+def compute_earning_yield(
+    earnings: pd.DataFrame, transactions: pd.DataFrame, economic: pd.DataFrame
+) -> pd.DataFrame:
+    """Calcula as colunas do `EarningYield` para
+    todos os proventos.
+
+    A posição na data de custódia é obtida através de somas
+    cumulativas das transações de cada ativo e uma junção
+    por busca binária (`merge_asof`) com as datas de custódia.
+
+    Args:
+        earnings: DataFrame de proventos (`EARNING_COLUMNS`).
+        transactions: DataFrame de transações (`TRANSACTION_COLUMNS`).
+        economic: DataFrame de dados econômicos (`ECONOMIC_COLUMNS`).
+
+    Returns:
+        pd.DataFrame: uma linha por provento, com as
+            mesmas colunas da tabela `earning_yield`.
+    """
+    # Merge keys must share the same dtype, which isn't
+    #   inferred for empty frames (e.g., no transactions)
+    df = earnings.assign(
+        hold_date=pd.to_datetime(earnings.hold_date),
+        b3_code=earnings.b3_code.astype(str),
+    )
+
+    # Cumulative position after each transaction
+    tx = transactions.assign(
+        date=pd.to_datetime(transactions.date),
+        b3_code=transactions.b3_code.astype(str),
+    )
+    tx = tx.sort_values(["b3_code", "date"], kind="stable")
+    is_buy = (tx.kind == TransactionKind.buy).to_numpy()
+    shares = tx.shares.to_numpy(dtype=float)
+    tx = tx.assign(
+        buy=np.where(is_buy, shares, 0.0),
+        sell=np.where(is_buy, 0.0, shares),
+        total_buy=np.where(is_buy, shares * tx.value_per_share.to_numpy(float), 0.0),
+    )
+    cumulative = tx.groupby("b3_code")[["buy", "sell", "total_buy"]].cumsum()
+    cumulative = cumulative.assign(b3_code=tx.b3_code, date=tx.date).sort_values(
+        "date", kind="stable"
+    )
+
+    # Position on hold date is the last cumulative
+    #   row with date <= hold_date
+    df = pd.merge_asof(
+        df.reset_index().sort_values("hold_date"),
+        cumulative,
+        left_on="hold_date",
+        right_on="date",
+        by="b3_code",
+        direction="backward",
+    )
+    df = df.set_index("index").sort_index()
+    df.index.name = None
+    held = (df.buy - df.sell).fillna(0.0).to_numpy()
+    has_position = held > 0
+    avg_price = np.where(
+        has_position, df.total_buy.to_numpy() / np.where(has_position, df.buy, 1), 0.0
+    )
+
+    # Economic data on hold month (last entry wins)
+    ec = economic.assign(
+        month=pd.to_datetime(economic.reference_date).dt.to_period("M"),
+        index=economic["index"].map(lambda v: v.name),
+    )
+    ec = ec.pivot_table(
+        index="month",
+        columns="index",
+        values="percentage_change",
+        aggfunc="last",
+    ).reindex(columns=[EconomicIndex.cdi.name, EconomicIndex.ipca.name])
+    ec = ec.reindex(df.hold_date.dt.to_period("M")).fillna(0.0)
+
+    # Earning yield columns
+    ir = df.ir.to_numpy(dtype=float)
+    value_per_share = df.value_per_share.to_numpy(dtype=float)
+    ir_adjusted_value_per_share = (1 - ir / 100) * value_per_share
+    shares = np.where(has_position, held, 0).astype(int)
+    return pd.DataFrame(
+        dict(
+            b3_code=df.b3_code.to_numpy(),
+            asset_kind=df.asset_kind.to_numpy(),
+            earning_id=df.earning_id.to_numpy(),
+            earning_kind=df.earning_kind.to_numpy(),
+            hold_date=df.hold_date.dt.date.to_numpy(),
+            payment_date=df.payment_date.to_numpy(),
+            ir=ir,
+            value_per_share=value_per_share,
+            ir_adjusted_value_per_share=ir_adjusted_value_per_share,
+            shares=shares,
+            avg_price=avg_price,
+            total_earnings=shares * ir_adjusted_value_per_share,
+            yoc=np.where(
+                has_position,
+                100 * ir_adjusted_value_per_share / np.where(has_position, avg_price, 1),
+                0.0,
+            ),
+            cdi_on_hold_month=ec[EconomicIndex.cdi.name].to_numpy(dtype=float),
+            ipca_on_hold_month=ec[EconomicIndex.ipca.name].to_numpy(dtype=float),
+        )
+    )
@@ -7,7 +7,12 @@ from .router import Router
 config = RouterConfig()
 
 # Create Router
-router = Router(config.notification_queue, config.yoc_queue, config.broker_url)
+router = Router(
+    config.notification_queue,
+    config.yoc_queue,
+    config.broker_url,
+    config.yoc_partitions,
+)
 
 # Start router
 router.run()
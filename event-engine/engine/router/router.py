@@ -8,6 +8,7 @@ import re
 
 import pika
 from engine.utils.messages import AnalyticEvent, AnalyticTrigger
+from engine.utils.partition import partition_key, partition_of, partition_queue
 from pydantic import ValidationError
 
 logger = logging.getLogger(__name__)
@@ -19,15 +20,17 @@ class Router:
         notification_queue: str,
         yoc_queue: str,
         broker_url: str,
+        yoc_partitions: int = 1,
     ):
         self._conn = None
         self._ch = None
         self._url = broker_url
         self._notif_queue = notification_queue
         self._yoc_queue = yoc_queue
+        self._yoc_partitions = yoc_partitions
         self._notification_pattern = re.compile(r"\[(?P<source>.+)\] (?P<message>.+)")
         self._wallet_pattern = re.compile(
-            r"(?P<operation>CREATED|UPDATED|DELETED) (?P<entity>\w+) WITH ID (?P<entity_id>\w+)(?: WITH REFERENCE TO (?P<reference>\w+) WITH ID (?P<reference_id>\w+))?",
+            r"(?P<operation>CREATED|UPDATED|DELETED) (?P<entity>\w+) WITH ID (?P<entity_id>[\w,]+)(?: WITH REFERENCE TO (?P<reference>\w+) WITH ID (?P<reference_id>\w+))?",
         )
         self._dashboard_pattern = re.compile(
             r"QUERIED (?P<kind>ASSET|GROUP) (?P<entity>\w+) ON (?P<table>\w+)",
@@ -41,9 +44,11 @@ class Router:
             logger.debug("Setting up connection for router...")
             self._setup_connection()
             logger.info(
-                "Router has started. Listening to '%s' and publishing to '%s'.",
+                "Router has started. Listening to '%s' and publishing "
+                "to '%s' (%d partitions).",
                 self._notif_queue,
                 self._yoc_queue,
+                self._yoc_partitions,
             )
             self._ch.start_consuming()
         finally:
@@ -58,6 +63,13 @@ class Router:
         self._ch.queue_declare(queue=self._notif_queue, durable=True)
         self._ch.basic_consume(self._notif_queue, self._on_notification, auto_ack=False)
 
+        # Setup processor queues (one per partition)
+        for i in range(self._yoc_partitions):
+            self._ch.queue_declare(
+                queue=partition_queue(self._yoc_queue, i, self._yoc_partitions),
+                durable=True,
+            )
+
     def _stop_connection(self):
         if self._ch is not None:
             self._ch.stop_consuming()
@@ -137,13 +149,24 @@ class Router:
             return None
 
     def _send_event(self, event: AnalyticEvent):
-        self._ch.basic_publish(
-            exchange="",
-            routing_key=self._yoc_queue,
-            body=event.model_dump_json(indent=2),
-            properties=pika.BasicProperties(
-                content_type="application/json",
-                content_encoding="utf-8",
-                delivery_mode=pika.DeliveryMode.Persistent,
-            ),
+        # Events of an asset always go to the same partition,
+        #   events without an asset go to all partitions
+        key = partition_key(event)
+        partitions = (
+            range(self._yoc_partitions)
+            if key is None
+            else [partition_of(key, self._yoc_partitions)]
         )
+
+        body = event.model_dump_json(indent=2)
+        for i in partitions:
+            self._ch.basic_publish(
+                exchange="",
+                routing_key=partition_queue(self._yoc_queue, i, self._yoc_partitions),
+                body=body,
+                properties=pika.BasicProperties(
+                    content_type="application/json",
+                    content_encoding="utf-8",
+                    delivery_mode=pika.DeliveryMode.Persistent,
+                ),
+            )
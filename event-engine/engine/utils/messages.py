@@ -46,6 +46,11 @@ class WalletUpdateInformation(BaseModel):
     reference: WalletEntity | None = None
     reference_id: str | None = None
 
+    @property
+    def entity_ids(self) -> list[str]:
+        # Batch notifications carry comma-separated ids
+        return self.entity_id.split(",")
+
 
 class QueryInformation(BaseModel):
     kind: QueryKind
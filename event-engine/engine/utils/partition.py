@@ -0,0 +1,40 @@
+"""Particionamento de eventos por ativo."""
+
+import zlib
+
+from engine.utils.messages import AnalyticEvent, AnalyticTrigger, WalletEntity
+
+
+def partition_of(b3_code: str, partitions: int) -> int:
+    """Retorna a partição responsável pelo ativo.
+
+    Utiliza um hash estável (CRC32) para que todos os
+    processos concordem sobre a partição de cada ativo.
+    """
+    return zlib.crc32(b3_code.encode("utf-8")) % partitions
+
+
+def partition_queue(queue: str, partition: int, partitions: int) -> str:
+    """Retorna o nome da fila de uma partição. Sem
+    particionamento, a fila original é utilizada.
+    """
+    if partitions <= 1:
+        return queue
+    return f"{queue}.{partition}"
+
+
+def partition_key(event: AnalyticEvent) -> str | None:
+    """Retorna o código B3 do ativo associado ao evento
+    ou `None` caso o evento afete todas as partições.
+    """
+    match event.trigger:
+        case AnalyticTrigger.wallet_update:
+            info = event.update_information
+            if info.entity == WalletEntity.asset:
+                return info.entity_id
+            if info.reference == WalletEntity.asset:
+                return info.reference_id
+        case AnalyticTrigger.price_scraper:
+            return event.price_scraper_information.asset_id
+
+    return None
@@ -0,0 +1,63 @@
+from datetime import date
+
+import pytest
+import sqlalchemy as sa
+from engine.processors.yoc import processor as yoc
+from invest_earning.database.analytic import EarningYield
+from invest_earning.database.wallet import AssetKind, EarningKind
+
+
+@pytest.fixture
+def earning_yields(processor, monkeypatch):
+    # Small clauses force the chunked and temporary table paths
+    monkeypatch.setattr(yoc, "_MAX_IN_CLAUSE_IDS", 2)
+
+    with sa.orm.Session(processor._analytic_engine) as session:
+        session.add_all(
+            EarningYield(
+                b3_code=f"ABC{earning_id % 2}11",
+                asset_kind=AssetKind.fii,
+                earning_id=earning_id,
+                earning_kind=EarningKind.dividend,
+                hold_date=date(2024, 1, 31),
+                payment_date=date(2024, 2, 15),
+                ir=0.0,
+                value_per_share=0.1,
+                ir_adjusted_value_per_share=0.1,
+                shares=0,
+                avg_price=0.0,
+                total_earnings=0.0,
+                yoc=0.0,
+                cdi_on_hold_month=0.0,
+                ipca_on_hold_month=0.0,
+            )
+            for earning_id in range(1, 11)
+        )
+        session.commit()
+
+
+def _remaining(processor) -> list[int]:
+    with sa.orm.Session(processor._analytic_engine) as session:
+        return session.scalars(
+            sa.select(EarningYield.earning_id).order_by(EarningYield.earning_id)
+        ).all()
+
+
+@pytest.mark.usefixtures("earning_yields")
+def test_drop_in_chunks(processor):
+    assert (
+        processor._drop_earning_yield_in(EarningYield.earning_id, [1, 2, 3, 4, 5]) == 5
+    )
+    assert _remaining(processor) == [6, 7, 8, 9, 10]
+
+    assert processor._drop_earning_yield_in(EarningYield.b3_code, ["ABC011"]) == 3
+    assert _remaining(processor) == [7, 9]
+
+
+@pytest.mark.usefixtures("earning_yields")
+@pytest.mark.parametrize("keep", [[3], [2, 4], [1, 5, 9, 42]])
+def test_drop_not_in(processor, keep):
+    assert processor._drop_earning_yield_not_in(keep) == 10 - len(
+        set(keep) & set(range(1, 11))
+    )
+    assert _remaining(processor) == [i for i in keep if i <= 10]
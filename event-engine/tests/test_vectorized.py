@@ -0,0 +1,116 @@
+from datetime import date
+
+import pytest
+import sqlalchemy as sa
+from invest_earning.database.analytic import EarningYield
+from invest_earning.database.wallet import (
+    Asset,
+    AssetKind,
+    Earning,
+    EarningKind,
+    EconomicData,
+    EconomicIndex,
+    Transaction,
+    TransactionKind,
+)
+
+
+def _wallet(with_transactions: bool) -> list:
+    assets = [
+        Asset(
+            b3_code=code,
+            name=code,
+            description="",
+            kind=AssetKind.fii,
+            added=date(2024, 1, 1),
+        )
+        for code in ["ABCD11", "EFGH11", "IJKL11"]
+    ]
+    earnings = [
+        Earning(
+            asset_b3_code=code,
+            hold_date=hold_date,
+            payment_date=hold_date.replace(day=15),
+            value_per_share=value,
+            ir_percentage=ir,
+            kind=EarningKind.dividend,
+        )
+        for code, hold_date, value, ir in [
+            ("ABCD11", date(2024, 1, 31), 0.10, 0.0),
+            ("ABCD11", date(2024, 2, 29), 0.11, 0.0),
+            ("ABCD11", date(2024, 3, 28), 0.12, 15.0),
+            ("ABCD11", date(2024, 4, 30), 0.09, 0.0),
+            ("EFGH11", date(2024, 2, 29), 1.00, 0.0),
+            ("EFGH11", date(2024, 3, 28), 1.10, 0.0),
+            ("IJKL11", date(2024, 3, 28), 0.50, 0.0),
+        ]
+    ]
+    transactions = [
+        Transaction(
+            asset_b3_code=code,
+            date=tx_date,
+            kind=kind,
+            value_per_share=value,
+            shares=shares,
+        )
+        for code, tx_date, kind, value, shares in [
+            ("ABCD11", date(2024, 1, 10), TransactionKind.buy, 10.0, 10),
+            ("ABCD11", date(2024, 1, 31), TransactionKind.buy, 12.0, 5),
+            ("ABCD11", date(2024, 3, 1), TransactionKind.sell, 13.0, 15),
+            ("ABCD11", date(2024, 4, 2), TransactionKind.buy, 9.0, 20),
+            ("EFGH11", date(2024, 3, 1), TransactionKind.buy, 100.0, 3),
+            ("EFGH11", date(2024, 5, 1), TransactionKind.buy, 110.0, 3),
+        ]
+    ]
+    economic = [
+        EconomicData(index=index, reference_date=ref, percentage_change=change)
+        for index, ref, change in [
+            (EconomicIndex.cdi, date(2024, 1, 1), 0.97),
+            (EconomicIndex.cdi, date(2024, 2, 1), 0.80),
+            (EconomicIndex.ipca, date(2024, 2, 1), 0.83),
+            (EconomicIndex.ima_b, date(2024, 3, 1), 0.50),
+        ]
+    ]
+    return assets + earnings + (transactions if with_transactions else []) + economic
+
+
+def _earning_yields(processor) -> list[dict]:
+    with sa.orm.Session(processor._analytic_engine) as session:
+        rows = session.scalars(
+            sa.select(EarningYield).order_by(EarningYield.earning_id)
+        ).all()
+        return [
+            {c.name: getattr(r, c.name) for c in EarningYield.__table__.columns}
+            for r in rows
+        ]
+
+
+def _run(processor, earnings_ids: list[int], threshold: int) -> list[dict]:
+    with sa.orm.Session(processor._analytic_engine) as session:
+        session.execute(sa.delete(EarningYield))
+        session.commit()
+
+    processor._vectorized_threshold = threshold
+    processor._create_or_update_multiple(earnings_ids)
+    return _earning_yields(processor)
+
+
+@pytest.mark.parametrize(
+    "wallet",
+    [[], _wallet(with_transactions=False), _wallet(with_transactions=True)],
+    ids=["empty", "no_transactions", "with_transactions"],
+)
+def test_vectorized_matches_scalar(processor, wallet):
+    with sa.orm.Session(processor._wallet_engine) as session:
+        session.add_all(wallet)
+        session.commit()
+        earnings_ids = session.scalars(sa.select(Earning.id)).all()
+
+    # Threshold above the number of rows uses the scalar path,
+    #   below it uses the vectorized engine
+    scalar = _run(processor, earnings_ids, len(earnings_ids) + 1)
+    vectorized = _run(processor, earnings_ids, 0)
+    assert len(scalar) == len(earnings_ids)
+    assert len(vectorized) == len(scalar)
+    for v, s in zip(vectorized, scalar):
+        assert v == pytest.approx(s)
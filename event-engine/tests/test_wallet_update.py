@@ -0,0 +1,40 @@
+import pytest
+from engine.processors.yoc.processor import _PendingWork
+from engine.utils.messages import (
+    DatabaseOperation,
+    WalletEntity,
+    WalletUpdateInformation,
+)
+
+
+@pytest.mark.parametrize("entity", [WalletEntity.earning, WalletEntity.transaction])
+@pytest.mark.parametrize("operation", list(DatabaseOperation))
+@pytest.mark.parametrize("entity_id", ["None", "1,abc", ""])
+def test_malformed_ids_are_skipped(processor, entity, operation, entity_id):
+    work = _PendingWork()
+    processor._process_wallet_update(
+        WalletUpdateInformation(
+            entity=entity,
+            operation=operation,
+            entity_id=entity_id,
+            reference=WalletEntity.asset,
+            reference_id="ABCD11",
+        ),
+        work,
+    )
+    assert work == _PendingWork()
+
+
+def test_well_formed_ids_are_scheduled(processor):
+    work = _PendingWork()
+    processor._process_wallet_update(
+        WalletUpdateInformation(
+            entity=WalletEntity.earning,
+            operation=DatabaseOperation.CREATED,
+            entity_id="1,2",
+            reference=WalletEntity.asset,
+            reference_id="ABCD11",
+        ),
+        work,
+    )
+    assert work.earnings == {1, 2}
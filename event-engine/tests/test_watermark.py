@@ -0,0 +1,37 @@
+from datetime import date
+
+import sqlalchemy as sa
+from engine.utils.messages import AnalyticTable, QueryInformation, QueryKind
+from invest_earning.database.wallet import Asset, AssetKind, WalletVersion
+
+_QUERY = QueryInformation(
+    kind=QueryKind.GROUP, entity="FII", table=AnalyticTable.earning_yield
+)
+
+
+def test_watermark_follows_bumps_without_counter_rows(processor):
+    with sa.orm.Session(processor._wallet_engine) as session:
+        assert (
+            session.scalar(sa.select(sa.func.count()).select_from(WalletVersion)) == 0
+        )
+
+    processor._process_dashboard_query(_QUERY)
+    assert processor._analytic_watermark() == 0
+
+    # The first write creates the missing counter rows
+    with sa.orm.Session(processor._wallet_engine) as session:
+        session.add(
+            Asset(
+                b3_code="ABCD11",
+                name="ABCD",
+                description="",
+                kind=AssetKind.fii,
+                added=date(2024, 1, 1),
+            )
+        )
+        session.commit()
+    version = processor._wallet_version()
+    assert version > 0
+
+    processor._process_dashboard_query(_QUERY)
+    assert processor._analytic_watermark() == version
@@ -28,24 +28,23 @@ def main():
             logger.info("Couldn't retrieve data for %s: %s", url, e)
             continue
 
-        for last in data[-4:]:
-            try:
+        # Single bulk request for the latest months
+        try:
+            rows = []
+            for last in data[-4:]:
                 date = last["data"].split("/")
-                requests.post(
-                    f"{config.wallet_api}/v1/economic/add",
-                    json=dict(
-                        data=[
-                            dict(
-                                index=index,
-                                reference_date=f"{date[2]}-{date[1]}-01",
-                                percentage_change=last["valor"],
-                            )
-                        ]
-                    ),
+                rows.append(
+                    dict(
+                        index=index,
+                        reference_date=f"{date[2]}-{date[1]}-01",
+                        percentage_change=last["valor"],
+                    )
                 )
-            except Exception as e:
-                logger.info("Couldn't update %s on date %s: %s", index, last["data"], e)
-                pass
+            requests.post(
+                f"{config.wallet_api}/v1/economic/add", json=dict(data=rows)
+            ).raise_for_status()
+        except Exception as e:
+            logger.info("Couldn't update %s: %s", index, e)
 
 
 if __name__ == "__main__":
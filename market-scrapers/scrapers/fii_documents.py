@@ -30,9 +30,10 @@ DOC_URL = base64.b64decode(
 
 def get_current_fiis() -> list[str]:
     positions = requests.get(
-        f"{config.wallet_api}/v1/position/on/{date.today().isoformat()}"
+        f"{config.wallet_api}/v1/position/on/{date.today().isoformat()}",
+        params=dict(asset_kind="FII"),
     ).json()
-    return [p["b3_code"] for p in positions if p["asset_kind"] == "FII"]
+    return [p["b3_code"] for p in positions]
 
 
 def get_fiis_cnpjs() -> list[tuple[str, str]]:
@@ -45,15 +46,27 @@ def get_fiis_cnpjs() -> list[tuple[str, str]]:
     return cnpjs
 
 
+def get_asset_documents(asset: str, start: str) -> set[str]:
+    urls, cursor = set(), None
+    while True:
+        response = requests.get(
+            f"{config.wallet_api}/v1/document/list",
+            params=dict(asset_b3_code=asset, start=start, cursor=cursor, limit=1000),
+        )
+        response.raise_for_status()
+        page = response.json()
+        urls.update(d["url"] for d in page["data"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return urls
+
+
 @click.command(name="fii_documents")
 def main():
-    documents = requests.get(f"{config.wallet_api}/v1/document/list").json()
     fiis = get_fiis_cnpjs()
     random.shuffle(fiis)
 
     for asset, cnpj in fiis:
-        asset_docs = set(d["url"] for d in documents if d["asset_b3_code"] == asset)
-
         try:
             response = requests.get(
                 f"{URL}{cnpj}",
@@ -76,6 +89,17 @@ def main():
             for d in response.json()["data"]
             if "relatorio" in unidecode(d["categoriaDocumento"]).lower()
         ]
+        if not available_docs:
+            continue
+
+        # Only documents as recent as the available ones might be repeated
+        try:
+            asset_docs = get_asset_documents(
+                asset, min(publish_date for _, publish_date, _ in available_docs)
+            )
+        except Exception as e:
+            logger.exception(e)
+            continue
 
         for title, publish_date, url in available_docs:
             if url in asset_docs:
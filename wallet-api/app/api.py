@@ -1,11 +1,27 @@
 """Entrypoint da API."""
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from . import v1
+from .cache import POSITION_CACHE
+from .config import METRICS_CONFIG
+from .metrics import METRICS, MetricsMiddleware
+from .outbox import RELAY
+from .publisher import PUBLISHER
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    RELAY.start()
+    yield
+    RELAY.stop()
+    PUBLISHER.close()
 
-app = FastAPI()
+
+app = FastAPI(lifespan=lifespan)
 restricted = FastAPI()
 restricted.add_middleware(
     CORSMiddleware,
@@ -16,6 +32,8 @@ restricted.add_middleware(
 )
 
 app.include_router(v1.router, prefix="/v1")
+if METRICS_CONFIG.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
 
 
 @restricted.get("/healthcheck", include_in_schema=False)
@@ -23,4 +41,20 @@ def healthcheck():
     return {"status": "healthy", "available_versions": ["v1"]}
 
 
+@restricted.get("/cache/position", include_in_schema=False)
+def position_cache_stats():
+    return POSITION_CACHE.stats()
+
+
+@restricted.get("/metrics", include_in_schema=False)
+def request_metrics():
+    return METRICS.stats()
+
+
+@restricted.post("/metrics/reset", include_in_schema=False)
+def request_metrics_reset():
+    METRICS.reset()
+    return {"status": "reset"}
+
+
 app.mount("/restricted", restricted)
@@ -0,0 +1,93 @@
+"""Cache de posições da API."""
+
+import logging
+import threading
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Callable, Hashable
+
+from .config import CACHE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Tables read when computing positions
+POSITION_TABLES = ["asset", "earning", "transaction", "share_ledger", "market_price"]
+
+
+class PositionCache:
+    """Cache LRU em memória das posições, indexado pela
+    data de referência e demais parâmetros da consulta.
+
+    A chave deve conter a versão da carteira (`POSITION_TABLES`),
+    compartilhada entre processos: escritas de outros workers
+    ou serviços (e.g., preços de mercado) geram novas entradas.
+    Escritas locais ainda podem liberar entradas obsoletas
+    através de `invalidate`.
+
+    Args:
+        max_size: quantidade máxima de entradas armazenadas.
+            Com `0`, o cache é desabilitado.
+    """
+
+    def __init__(self, max_size: int):
+        self._max_size = max_size
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._hits = 0
+        self._misses = 0
+        self._data: OrderedDict[tuple[date, Hashable], Any] = OrderedDict()
+
+    def get_or_compute(
+        self, reference_date: date, key: Hashable, compute: Callable[[], Any]
+    ) -> Any:
+        full_key = (reference_date, key)
+        with self._lock:
+            if full_key in self._data:
+                self._hits += 1
+                self._data.move_to_end(full_key)
+                return self._data[full_key]
+            self._misses += 1
+            generation = self._generation
+
+        value = compute()
+
+        with self._lock:
+            # An invalidation might have happened while computing,
+            #   in which case the value could be stale
+            if self._max_size > 0 and generation == self._generation:
+                self._data[full_key] = value
+                self._data.move_to_end(full_key)
+                while len(self._data) > self._max_size:
+                    self._data.popitem(last=False)
+
+        return value
+
+    def invalidate(self, since: date = None) -> int:
+        """Remove as entradas com data de referência igual ou
+        posterior a `since` (todas, se `None`).
+
+        Returns:
+            int: quantidade de entradas removidas.
+        """
+        with self._lock:
+            self._generation += 1
+            keys = [k for k in self._data if since is None or k[0] >= since]
+            for k in keys:
+                del self._data[k]
+
+        logger.debug(
+            "Invalidated %d position cache entries (since=%s).", len(keys), since
+        )
+        return len(keys)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(
+                size=len(self._data),
+                max_size=self._max_size,
+                hits=self._hits,
+                misses=self._misses,
+            )
+
+
+POSITION_CACHE = PositionCache(CACHE_CONFIG.position_cache_size)
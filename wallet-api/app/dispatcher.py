@@ -1,13 +1,21 @@
 """Dispatcher de notificações."""
 
+import itertools
 import re
 from enum import Enum
 
-import pika
+import sqlalchemy as sa
 from fastapi import Depends
-from invest_earning.database.wallet import Asset, Earning, EconomicData, Transaction
+from invest_earning.database.wallet import (
+    Asset,
+    Earning,
+    EconomicData,
+    NotificationOutbox,
+    Transaction,
+)
 
-from .config import DISPATCHER_CONFIG
+from .db import RequiresSession
+from .outbox import RELAY
 
 
 class NotificationDispatcher:
@@ -16,93 +24,95 @@ class NotificationDispatcher:
         UPDATED = "UPDATED"
         DELETED = "DELETED"
 
-    def __init__(self, close_after_any_notification: bool = False):
-        self._conn = pika.BlockingConnection(
-            pika.URLParameters(DISPATCHER_CONFIG.broker_url)
-        )
-        self._ch = self._conn.channel()
-        self._should_close = close_after_any_notification
-
-        # Create temporary queue
-        self._ch.queue_declare("", auto_delete=True)
-
-    def close(self):
-        if self._ch is not None:
-            self._ch.close()
-            self._ch = None
-
-        if self._conn is not None:
-            self._conn.close()
-            self._conn = None
+    def __init__(self, session: sa.orm.Session):
+        # Notifications are written to the outbox, thus
+        #   committed along with the entities changes
+        self._session = session
 
     def notify_asset_create(self, asset: Asset):
-        self._notify(self.Operation.CREATED, Asset, asset.b3_code)
+        self._notify(self.Operation.CREATED, Asset, [asset])
 
     def notify_asset_delete(self, asset: Asset):
-        self._notify(self.Operation.DELETED, Asset, asset.b3_code)
+        self._notify(self.Operation.DELETED, Asset, [asset])
 
     def notify_earning_create(self, earning: Earning):
-        self._notify(
-            self.Operation.CREATED, Earning, earning.id, Asset, earning.asset_b3_code
-        )
+        self._notify(self.Operation.CREATED, Earning, [earning], Asset)
 
     def notify_earning_update(self, earning: Earning, updated_fields: dict[str, tuple]):
-        self._notify(
-            self.Operation.UPDATED, Earning, earning.id, Asset, earning.asset_b3_code
-        )
+        self._notify(self.Operation.UPDATED, Earning, [earning], Asset)
 
     def notify_earning_delete(self, earning: Earning):
-        self._notify(
-            self.Operation.DELETED, Earning, earning.id, Asset, earning.asset_b3_code
-        )
+        self._notify(self.Operation.DELETED, Earning, [earning], Asset)
+
+    def notify_earnings_create(self, earnings: list[Earning]):
+        self._notify_batch(self.Operation.CREATED, Earning, earnings)
 
     def notify_transaction_create(self, transaction: Transaction):
-        self._notify(
-            self.Operation.CREATED,
-            Transaction,
-            transaction.id,
-            Asset,
-            transaction.asset_b3_code,
-        )
+        self._notify(self.Operation.CREATED, Transaction, [transaction], Asset)
+
+    def notify_transactions_create(self, transactions: list[Transaction]):
+        self._notify_batch(self.Operation.CREATED, Transaction, transactions)
 
     def notify_transaction_update(
         self, transaction: Transaction, updated_fields: dict[str, tuple]
     ):
-        self._notify(
-            self.Operation.UPDATED,
-            Transaction,
-            transaction.id,
-            Asset,
-            transaction.asset_b3_code,
-        )
+        self._notify(self.Operation.UPDATED, Transaction, [transaction], Asset)
 
     def notify_transaction_delete(self, transaction: Transaction):
-        self._notify(
-            self.Operation.DELETED,
-            Transaction,
-            transaction.id,
-            Asset,
-            transaction.asset_b3_code,
-        )
+        self._notify(self.Operation.DELETED, Transaction, [transaction], Asset)
 
-    def notify_economic_add(self, economic: EconomicData):
-        self._notify(
-            self.Operation.CREATED, EconomicData, self._economic_pk_to_str(economic)
-        )
+    def notify_economics_add(self, economics: list[EconomicData]):
+        # A single notification covering all affected months
+        if economics:
+            self._notify(
+                self.Operation.CREATED,
+                EconomicData,
+                sorted(economics, key=self._economic_pk_to_str),
+            )
 
     def notify_economic_delete(self, economic: EconomicData):
-        self._notify(
-            self.Operation.DELETED, EconomicData, self._economic_pk_to_str(economic)
-        )
+        self._notify(self.Operation.DELETED, EconomicData, [economic])
 
     def _notify(
+        self,
+        operation: Operation,
+        ent_cls: type[Earning | EconomicData | Transaction | Asset],
+        entities: list[Earning | EconomicData | Transaction | Asset],
+        ref_cls: type[Asset] = None,
+    ):
+        # Pending entities might not have an id yet, thus
+        #   the session is flushed before reading them
+        self._session.flush()
+        ent_id = ",".join(str(self._id_of(ent_cls, e)) for e in entities)
+        ref_id = None if ref_cls is None else entities[0].asset_b3_code
+        self._session.add(
+            NotificationOutbox(
+                body=self._format(operation, ent_cls, ent_id, ref_cls, ref_id)
+            )
+        )
+
+    def _notify_batch(
+        self,
+        operation: Operation,
+        ent_cls: type[Earning | Transaction],
+        entities: list[Earning | Transaction],
+    ):
+        # A single notification per asset listing all ids, which
+        #   keeps the events of an asset in the same partition
+        def key(e: Earning | Transaction) -> str:
+            return e.asset_b3_code
+
+        for _, group in itertools.groupby(sorted(entities, key=key), key=key):
+            self._notify(operation, ent_cls, list(group), Asset)
+
+    def _format(
         self,
         operation: Operation,
         ent_cls: type[Earning | EconomicData | Transaction | Asset],
         ent_id: str | int,
         ref_cls: type[Earning | EconomicData | Transaction | Asset] = None,
         ref_id: str | int = None,
-    ):
+    ) -> str:
         # Format notification message
         ent_name = self._normalize_name(ent_cls.__name__)
         data = f"[wallet-api] {operation.value} {ent_name} WITH ID {ent_id}"
@@ -113,21 +123,20 @@ class NotificationDispatcher:
             ref_name = self._normalize_name(ref_cls.__name__)
             data = f"{data} WITH REFERENCE TO {ref_name} WITH ID {ref_id}"
 
-        # Publish into queue
-        self._ch.basic_publish(
-            exchange="",
-            routing_key=DISPATCHER_CONFIG.notification_queue,
-            body=data,
-            properties=pika.BasicProperties(
-                content_type="text/plain",
-                content_encoding="utf-8",
-                delivery_mode=pika.DeliveryMode.Persistent,
-            ),
-        )
+        return data
 
-        # Maybe the dispatcher is short-lived?
-        if self._should_close:
-            self.close()
+    @classmethod
+    def _id_of(
+        cls,
+        ent_cls: type[Earning | EconomicData | Transaction | Asset],
+        entity: Earning | EconomicData | Transaction | Asset,
+    ) -> str | int:
+        if ent_cls is Asset:
+            return entity.b3_code
+        if ent_cls is EconomicData:
+            return cls._economic_pk_to_str(entity)
+        assert entity.id is not None
+        return entity.id
 
     @staticmethod
     def _economic_pk_to_str(economic: EconomicData) -> str:
@@ -138,13 +147,11 @@ class NotificationDispatcher:
         return "_".join(re.findall(r"[A-Z][a-z]+", name)).lower()
 
 
-def get_dispatcher() -> NotificationDispatcher:
-    # AMQP connections are currently short-lived, which
-    #   is undesirable. I should probably change the
-    #   client from pika to one that supports multi-threading.
-    dispatcher = NotificationDispatcher(close_after_any_notification=True)
-    yield dispatcher
-    dispatcher.close()
+def get_dispatcher(session=RequiresSession) -> NotificationDispatcher:
+    yield NotificationDispatcher(session)
+
+    # Notifications might have been committed
+    RELAY.wake()
 
 
 RequiresDispatcher = Depends(get_dispatcher)
@@ -0,0 +1,191 @@
+"""Instrumentação das requisições da API."""
+
+import bisect
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+import sqlalchemy as sa
+
+from .config import METRICS_CONFIG
+from .db import engine
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the histogram buckets (the last one is unbounded)
+_BUCKETS = dict(
+    latency_ms=[1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000],
+    db_ms=[1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000],
+    statements=[0, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000],
+    response_bytes=[1e3, 1e4, 1e5, 1e6, 1e7, 1e8],
+)
+
+
+@dataclass
+class RequestStats:
+    """Estatísticas de uma requisição."""
+
+    start: float = field(default_factory=time.perf_counter)
+    statements: int = 0
+    db_time: float = 0.0
+    response_bytes: int = 0
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start
+
+
+_CURRENT: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+class _Histogram:
+    def __init__(self, bounds: list[float]):
+        self._bounds = bounds
+        self._counts = [0] * (len(bounds) + 1)
+        self._sum = 0.0
+        self._max = 0.0
+
+    def observe(self, value: float):
+        self._counts[bisect.bisect_left(self._bounds, value)] += 1
+        self._sum += value
+        self._max = max(self._max, value)
+
+    def to_dict(self) -> dict:
+        return dict(
+            sum=self._sum,
+            max=self._max,
+            buckets={str(b): c for b, c in zip([*self._bounds, "+Inf"], self._counts)},
+        )
+
+
+class RequestMetrics:
+    """Agregador de estatísticas por rota, com
+    histogramas de latência, tempo de banco,
+    quantidade de consultas SQL e tamanho das
+    respostas.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes: dict[str, tuple[int, dict[str, _Histogram]]] = dict()
+
+    def observe(self, route: str, stats: RequestStats, latency: float):
+        values = dict(
+            latency_ms=latency * 1e3,
+            db_ms=stats.db_time * 1e3,
+            statements=stats.statements,
+            response_bytes=stats.response_bytes,
+        )
+        with self._lock:
+            count, histograms = self._routes.get(route, (0, None))
+            if histograms is None:
+                histograms = {k: _Histogram(b) for k, b in _BUCKETS.items()}
+            for k, v in values.items():
+                histograms[k].observe(v)
+            self._routes[route] = (count + 1, histograms)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                route: dict(
+                    count=count, **{k: h.to_dict() for k, h in histograms.items()}
+                )
+                for route, (count, histograms) in sorted(self._routes.items())
+            }
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+
+
+METRICS = RequestMetrics()
+
+
+class MetricsMiddleware:
+    """Middleware ASGI que registra, por requisição, a
+    quantidade de consultas SQL, o tempo de banco, a
+    latência total e o tamanho da resposta.
+
+    Os valores disponíveis no início da resposta são
+    enviados nos cabeçalhos `X-DB-Statements` e
+    `Server-Timing`. Os valores finais (incluindo o
+    corpo de respostas em streaming) são agregados em
+    `METRICS`.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _CURRENT.set(stats)
+
+        async def send_wrapper(message):
+            match message["type"]:
+                case "http.response.start":
+                    message["headers"] = [
+                        *message.get("headers", []),
+                        (b"x-db-statements", str(stats.statements).encode()),
+                        (
+                            b"server-timing",
+                            (
+                                f"db;dur={stats.db_time * 1e3:.2f}, "
+                                f"app;dur={stats.elapsed() * 1e3:.2f}"
+                            ).encode(),
+                        ),
+                    ]
+                case "http.response.body":
+                    stats.response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _CURRENT.reset(token)
+            METRICS.observe(_route_of(scope), stats, stats.elapsed())
+
+
+def _route_of(scope) -> str:
+    # Routes are grouped by their path template (set
+    #   during routing), avoiding one entry per path
+    route = scope.get("route")
+    template = getattr(route, "path_format", None)
+    if template is None:
+        return "unmatched"
+
+    # Prefixes of included routers and mounts aren't part
+    #   of the route template, thus they are recovered from
+    #   the request path
+    path = scope["path"]
+    try:
+        matched = template.format(**scope.get("path_params", {}))
+    except (KeyError, IndexError, ValueError):
+        matched = None
+    if matched is not None and path.endswith(matched):
+        prefix = path.removesuffix(matched)
+    else:
+        prefix = scope.get("root_path", "")
+    return f"{scope['method']} {prefix}{template}"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _CURRENT.get() is not None:
+        conn.info["query_start"] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _CURRENT.get()
+    start = conn.info.pop("query_start", None)
+    if stats is not None and start is not None:
+        stats.statements += 1
+        stats.db_time += time.perf_counter() - start
+
+
+if METRICS_CONFIG.metrics_enabled:
+    sa.event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    sa.event.listen(engine, "after_cursor_execute", _after_cursor_execute)
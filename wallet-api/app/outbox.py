@@ -0,0 +1,135 @@
+"""Envio das notificações da caixa de saída."""
+
+import logging
+import threading
+
+import pika
+import sqlalchemy as sa
+from invest_earning.database.wallet import NotificationOutbox
+
+from .config import DISPATCHER_CONFIG
+from .db import engine
+from .publisher import PUBLISHER, AMQPPublisher
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxRelay:
+    """Envia as notificações da caixa de saída para a fila
+    de notificações em lotes, em uma thread de background.
+
+    Notificações só são removidas da caixa de saída após
+    o envio, garantindo entrega ao menos uma vez. Dentro
+    de um lote, notificações idênticas (e.g., atualizações
+    repetidas de uma mesma entidade) são enviadas uma
+    única vez, na posição da última ocorrência.
+
+    Args:
+        engine: engine do banco da carteira.
+        publisher: publicador AMQP.
+        queue: fila de notificações.
+        batch_size: quantidade máxima de notificações
+            por lote.
+        poll_interval: intervalo (segundos) entre
+            verificações da caixa de saída.
+    """
+
+    def __init__(
+        self,
+        engine: sa.Engine,
+        publisher: AMQPPublisher,
+        queue: str,
+        batch_size: int = 500,
+        poll_interval: float = 1.0,
+    ):
+        self._engine = engine
+        self._publisher = publisher
+        self._queue = queue
+        self._batch_size = batch_size
+        self._poll_interval = poll_interval
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        assert self._thread is None
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="outbox-relay", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        if self._thread is None:
+            return
+
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def wake(self):
+        self._wake.set()
+
+    def drain(self) -> int:
+        """Envia um lote de notificações.
+
+        Returns:
+            int: quantidade de notificações removidas
+                da caixa de saída.
+        """
+        with sa.orm.Session(self._engine) as session:
+            # Concurrent relays (e.g., multiple workers) skip
+            #   rows being sent by others
+            rows = session.execute(
+                sa.select(NotificationOutbox.id, NotificationOutbox.body)
+                .order_by(NotificationOutbox.id)
+                .limit(self._batch_size)
+                .with_for_update(skip_locked=True)
+            ).all()
+            if not rows:
+                return 0
+
+            # Keep only the last occurrence of identical notifications
+            bodies = list(reversed(dict.fromkeys(body for _, body in reversed(rows))))
+            for body in bodies:
+                self._publisher.publish(
+                    routing_key=self._queue,
+                    body=body,
+                    properties=pika.BasicProperties(
+                        content_type="text/plain",
+                        content_encoding="utf-8",
+                        delivery_mode=pika.DeliveryMode.Persistent,
+                    ),
+                )
+
+            session.execute(
+                sa.delete(NotificationOutbox).where(
+                    NotificationOutbox.id.in_([i for i, _ in rows])
+                )
+            )
+            session.commit()
+
+        logger.debug("Relayed %d notifications (%d sent).", len(rows), len(bodies))
+        return len(rows)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.clear()
+            try:
+                # Full batches indicate there might be more
+                while self.drain() >= self._batch_size:
+                    pass
+            except Exception:
+                logger.exception("Unable to relay notifications, retrying later.")
+
+            self._wake.wait(self._poll_interval)
+
+
+RELAY = OutboxRelay(
+    engine,
+    PUBLISHER,
+    DISPATCHER_CONFIG.notification_queue,
+    batch_size=DISPATCHER_CONFIG.outbox_batch_size,
+    poll_interval=DISPATCHER_CONFIG.outbox_poll_interval,
+)
@@ -0,0 +1,134 @@
+"""Publicador AMQP compartilhado pela API."""
+
+import logging
+import queue
+import threading
+
+import pika
+import pika.exceptions
+
+from .config import DISPATCHER_CONFIG
+
+logger = logging.getLogger(__name__)
+
+
+class _PooledChannel:
+    # BlockingConnection is not thread-safe, thus each
+    #   pooled channel owns its connection
+    def __init__(self, url: str, confirm_delivery: bool):
+        self.conn = pika.BlockingConnection(pika.URLParameters(url))
+        self.ch = self.conn.channel()
+        if confirm_delivery:
+            self.ch.confirm_delivery()
+
+    @property
+    def is_open(self) -> bool:
+        if not (self.conn.is_open and self.ch.is_open):
+            return False
+
+        # Idle connections don't process heartbeats, the broker
+        #   might have closed them in the meantime
+        try:
+            self.conn.process_data_events(time_limit=0)
+        except pika.exceptions.AMQPError:
+            return False
+        return self.conn.is_open and self.ch.is_open
+
+    def close(self):
+        try:
+            if self.conn.is_open:
+                self.conn.close()
+        except pika.exceptions.AMQPError:
+            pass
+
+
+class AMQPPublisher:
+    """Publicador AMQP com um pool de canais, compartilhado
+    entre as threads da API.
+
+    Conexões são criadas sob demanda (até `pool_size`) e
+    reutilizadas entre publicações. Conexões perdidas são
+    recriadas automaticamente.
+
+    Args:
+        url: string de conexão com o broker.
+        pool_size: quantidade máxima de canais abertos.
+        confirm_delivery: se `True`, aguarda a confirmação
+            do broker para cada publicação.
+        retries: quantidade de novas tentativas após
+            falhas de conexão.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        pool_size: int = 4,
+        confirm_delivery: bool = False,
+        retries: int = 1,
+    ):
+        self._url = url
+        self._confirm_delivery = confirm_delivery
+        self._retries = retries
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._idle: queue.LifoQueue[_PooledChannel] = queue.LifoQueue()
+
+    def publish(self, routing_key: str, body: str, properties: pika.BasicProperties):
+        for attempt in range(self._retries + 1):
+            with self._slots:
+                channel = None
+                try:
+                    channel = self._acquire()
+                    channel.ch.basic_publish(
+                        exchange="",
+                        routing_key=routing_key,
+                        body=body,
+                        properties=properties,
+                    )
+                except (
+                    pika.exceptions.AMQPConnectionError,
+                    pika.exceptions.AMQPChannelError,
+                ) as e:
+                    if channel is not None:
+                        channel.close()
+                    if attempt == self._retries:
+                        raise
+                    logger.warning("Publish failed (%s), reconnecting...", e)
+                    continue
+                except Exception:
+                    # e.g., message nack'ed by the broker
+                    if channel is not None:
+                        channel.close()
+                    raise
+
+                self._idle.put(channel)
+                return
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+    def _acquire(self) -> _PooledChannel:
+        # Reuse idle channels, dropping closed ones
+        while True:
+            try:
+                channel = self._idle.get_nowait()
+            except queue.Empty:
+                break
+
+            if channel.is_open:
+                return channel
+            channel.close()
+
+        logger.debug("Opening new AMQP connection.")
+        return _PooledChannel(self._url, self._confirm_delivery)
+
+
+PUBLISHER = AMQPPublisher(
+    DISPATCHER_CONFIG.broker_url,
+    pool_size=DISPATCHER_CONFIG.publisher_pool_size,
+    confirm_delivery=DISPATCHER_CONFIG.publisher_confirms,
+    retries=DISPATCHER_CONFIG.publisher_retries,
+)
@@ -5,12 +5,17 @@ de um facade.
 
 import functools
 from datetime import date
-from typing import Annotated
+from typing import Annotated, Literal
+
+import pandas as pd
+import sqlalchemy as sa
 
 from app import utils as app_utils
+from app.cache import POSITION_CACHE, POSITION_TABLES
 from app.db import RequiresSession
 from app.dispatcher import RequiresDispatcher
-from fastapi import APIRouter, Body, HTTPException, Response
+from fastapi import APIRouter, Body, Header, HTTPException, Query, Response
+from fastapi.responses import JSONResponse
 from invest_earning.database.wallet import (
     Asset,
     AssetDocument,
@@ -22,18 +27,24 @@ from invest_earning.database.wallet import (
     Position,
     Transaction,
     TransactionKind,
+    WalletVersion,
 )
 
 from . import utils
 from .models import (
     AssetDocumentSchemaV1,
     AssetSchemaV1,
+    EarningCreateSchemaV1,
     EarningSchemaV1,
     EconomicSchemaV1,
+    PageSchemaV1,
+    PositionHistorySchemaV1,
+    TransactionCreateSchemaV1,
     TransactionSchemaV1,
 )
 
 EmbedBody = functools.partial(Body, embed=True)
+PageLimit = Annotated[int, Query(ge=1, le=1000)]
 
 router = APIRouter()
 asset = APIRouter(prefix="/asset", tags=["v1 · Ativos"])
@@ -54,7 +65,9 @@ def get_asset(b3_code: str, session=RequiresSession) -> AssetSchemaV1:
 
 
 @asset.get("/list")
-def list_assets(session=RequiresSession) -> list[AssetSchemaV1]:
+def list_assets(
+    session=RequiresSession, cache=utils.revalidate(Asset.__tablename__)
+) -> list[AssetSchemaV1]:
     """Retorna todos ativos cadastrados no sistema."""
     return list(session.query(Asset).all())
 
@@ -85,10 +98,14 @@ def create_asset(
         added=added,
     )
     session.add(asset)
-    session.commit()
 
     # Notify
     dispatcher.notify_asset_create(asset)
+
+    # Commit
+    session.commit()
+    POSITION_CACHE.invalidate()
+
     return asset
 
 
@@ -119,6 +136,7 @@ def update_asset(
 
     # Commit
     session.commit()
+    POSITION_CACHE.invalidate()
 
     return asset
 
@@ -143,12 +161,13 @@ def delete_asset(
     # Delete
     session.delete(asset)
 
-    # Commit
-    session.commit()
-
     # Notify
     dispatcher.notify_asset_delete(asset)
 
+    # Commit
+    session.commit()
+    POSITION_CACHE.invalidate()
+
 
 @earnings.post("/create")
 def create_earning(
@@ -173,16 +192,39 @@ def create_earning(
     )
     session.add(earning)
 
-    # Update earnings rights
-    utils.update_earning_rights(earning=earning, session=session)
+    # Notify
+    dispatcher.notify_earning_create(earning)
 
     # Commit
     session.commit()
+    POSITION_CACHE.invalidate(earning.payment_date)
+
+    return earning
+
+
+@earnings.post("/bulk")
+def create_earnings(
+    data: Annotated[list[EarningCreateSchemaV1], EmbedBody()],
+    session=RequiresSession,
+    dispatcher=RequiresDispatcher,
+) -> list[EarningSchemaV1]:
+    """Adiciona proventos em bulk, em uma única transação."""
+    if not data:
+        return []
+    utils.check_assets_exist(session, {d.asset_b3_code for d in data})
+
+    # Create earnings
+    earnings = [Earning(**d.model_dump()) for d in data]
+    session.add_all(earnings)
 
     # Notify
-    dispatcher.notify_earning_create(earning)
+    dispatcher.notify_earnings_create(earnings)
 
-    return earning
+    # Commit
+    session.commit()
+    POSITION_CACHE.invalidate(min(e.payment_date for e in earnings))
+
+    return earnings
 
 
 @earnings.patch("/update/{earning_id}")
@@ -223,14 +265,14 @@ def update_earning(
             updated_fields[field] = (getattr(earning, field), value)
             setattr(earning, field, value)
 
-    # Update rights
-    utils.update_earning_rights(session=session, earning=earning)
+    # Notify
+    dispatcher.notify_earning_update(earning, updated_fields)
 
     # Commit
     session.commit()
-
-    # Notify
-    dispatcher.notify_earning_update(earning, updated_fields)
+    POSITION_CACHE.invalidate(
+        min([earning.payment_date, *updated_fields.get("payment_date", [])])
+    )
 
     return earning
 
@@ -255,12 +297,13 @@ def delete_earning(
     # Delete
     session.delete(earning)
 
-    # Commit
-    session.commit()
-
     # Notify
     dispatcher.notify_earning_delete(earning)
 
+    # Commit
+    session.commit()
+    POSITION_CACHE.invalidate(earning.payment_date)
+
 
 @earnings.get("/info/{asset_b3_code}")
 def asset_earnings(
@@ -273,9 +316,41 @@ def asset_earnings(
 
 
 @earnings.get("/list")
-def list_earnings(session=RequiresSession) -> list[EarningSchemaV1]:
-    """Retorna todos os proventos cadastrados no sistema."""
-    return list(session.query(Earning).all())
+def list_earnings(
+    asset_b3_code: str = None,
+    kind: Annotated[list[EarningKind], Query()] = None,
+    start: date = None,
+    end: date = None,
+    sort_by: Literal["id", "payment_date"] = "id",
+    order: Literal["asc", "desc"] = "asc",
+    cursor: str = None,
+    limit: PageLimit = 100,
+    accept: Annotated[str, Header()] = None,
+    session=RequiresSession,
+    cache=utils.revalidate(Earning.__tablename__),
+) -> PageSchemaV1[EarningSchemaV1]:
+    """Retorna uma página dos proventos cadastrados no sistema. Opcionalmente,
+    filtra pelo ativo, tipos de provento e intervalo de datas de pagamento
+    (`start` e `end`, inclusivos).
+
+    A próxima página é obtida informando o `next_cursor` da resposta como
+    `cursor`, mantendo os demais parâmetros. Com `Accept` igual a
+    `application/x-ndjson` ou `application/vnd.apache.arrow.stream`, todos os
+    registros (a partir de `cursor`) são enviados em streaming.
+    """
+    query = sa.select(Earning)
+    if asset_b3_code is not None:
+        query = query.where(Earning.asset_b3_code == asset_b3_code)
+    if kind is not None:
+        query = query.where(Earning.kind.in_(kind))
+    query = utils.where_between(query, Earning.payment_date, start, end)
+
+    keys = [Earning.id]
+    if sort_by == "payment_date":
+        keys.insert(0, Earning.payment_date)
+    return utils.paginate(
+        session, query, keys, order, cursor, limit, EarningSchemaV1, accept, cache
+    )
 
 
 @transactions.post("/create")
@@ -299,16 +374,46 @@ def create_transaction(
     )
     session.add(transaction)
 
-    # Update earnings rights
-    utils.update_earning_rights(transaction=transaction, session=session)
+    # Update shares ledger
+    utils.update_share_ledger(session, [transaction.asset_b3_code])
+
+    # Notify
+    dispatcher.notify_transaction_create(transaction)
 
     # Commit
     session.commit()
+    POSITION_CACHE.invalidate(transaction.date)
+
+    return transaction
+
+
+@transactions.post("/bulk")
+def create_transactions(
+    data: Annotated[list[TransactionCreateSchemaV1], EmbedBody()],
+    session=RequiresSession,
+    dispatcher=RequiresDispatcher,
+) -> list[TransactionSchemaV1]:
+    """Cadastra transações em bulk, em uma única transação."""
+    if not data:
+        return []
+    b3_codes = {d.asset_b3_code for d in data}
+    utils.check_assets_exist(session, b3_codes)
+
+    # Create transactions
+    transactions = [Transaction(**d.model_dump()) for d in data]
+    session.add_all(transactions)
+
+    # Update shares ledger
+    utils.update_share_ledger(session, b3_codes)
 
     # Notify
-    dispatcher.notify_transaction_create(transaction)
+    dispatcher.notify_transactions_create(transactions)
 
-    return transaction
+    # Commit
+    session.commit()
+    POSITION_CACHE.invalidate(min(t.date for t in transactions))
+
+    return transactions
 
 
 @transactions.patch("/update/{transaction_id}")
@@ -342,13 +447,19 @@ def update_transaction(
             updated_fields[field] = (getattr(transaction, field), value)
             setattr(transaction, field, value)
 
-    utils.update_earning_rights(transaction=transaction, session=session)
+    # Update shares ledger (previous asset might have changed)
+    utils.update_share_ledger(
+        session,
+        [transaction.asset_b3_code, *updated_fields.get("asset_b3_code", [])],
+    )
+
+    # Notify
+    dispatcher.notify_transaction_update(transaction, updated_fields)
 
     # Commit
     session.commit()
+    POSITION_CACHE.invalidate(min([transaction.date, *updated_fields.get("date", [])]))
 
-    # Notify
-    dispatcher.notify_transaction_update(transaction, updated_fields)
     return transaction
 
 
@@ -373,13 +484,15 @@ def delete_transaction(
 
     # Delete
     session.delete(transaction)
-
-    # Commit
-    session.commit()
+    utils.update_share_ledger(session, [transaction.asset_b3_code])
 
     # Notify
     dispatcher.notify_transaction_delete(transaction)
 
+    # Commit
+    session.commit()
+    POSITION_CACHE.invalidate(transaction.date)
+
 
 @transactions.get("/info/{asset_b3_code}")
 def asset_transactions(
@@ -394,9 +507,41 @@ def asset_transactions(
 
 
 @transactions.get("/list")
-def list_transactions(session=RequiresSession) -> list[TransactionSchemaV1]:
-    """Retorna todas transações cadastradas no sistema."""
-    return list(session.query(Transaction).all())
+def list_transactions(
+    asset_b3_code: str = None,
+    kind: Annotated[list[TransactionKind], Query()] = None,
+    start: date = None,
+    end: date = None,
+    sort_by: Literal["id", "date"] = "id",
+    order: Literal["asc", "desc"] = "asc",
+    cursor: str = None,
+    limit: PageLimit = 100,
+    accept: Annotated[str, Header()] = None,
+    session=RequiresSession,
+    cache=utils.revalidate(Transaction.__tablename__),
+) -> PageSchemaV1[TransactionSchemaV1]:
+    """Retorna uma página das transações cadastradas no sistema. Opcionalmente,
+    filtra pelo ativo, tipos de transação e intervalo de datas (`start` e
+    `end`, inclusivos).
+
+    A próxima página é obtida informando o `next_cursor` da resposta como
+    `cursor`, mantendo os demais parâmetros. Com `Accept` igual a
+    `application/x-ndjson` ou `application/vnd.apache.arrow.stream`, todos os
+    registros (a partir de `cursor`) são enviados em streaming.
+    """
+    query = sa.select(Transaction)
+    if asset_b3_code is not None:
+        query = query.where(Transaction.asset_b3_code == asset_b3_code)
+    if kind is not None:
+        query = query.where(Transaction.kind.in_(kind))
+    query = utils.where_between(query, Transaction.date, start, end)
+
+    keys = [Transaction.id]
+    if sort_by == "date":
+        keys.insert(0, Transaction.date)
+    return utils.paginate(
+        session, query, keys, order, cursor, limit, TransactionSchemaV1, accept, cache
+    )
 
 
 @economic.post("/add")
@@ -405,36 +550,32 @@ def add_economic_data(
     session=RequiresSession,
     dispatcher=RequiresDispatcher,
 ) -> list[EconomicSchemaV1]:
-    """Adiciona dados econômicos em bulk."""
-    objects = []
-    for idx, d in enumerate(data):
-        d = d.dict()
-        d["reference_date"] = app_utils.to_last_day_of_the_month(d["reference_date"])
-
-        # Check whether it already exists
-        economic_data = (
-            session.query(EconomicData)
-            .where(EconomicData.index == d["index"])
-            .where(EconomicData.reference_date == d["reference_date"])
-            .one_or_none()
+    """Adiciona ou atualiza dados econômicos em bulk. Dados de um mesmo
+    índice e mês são sobrescritos pelo último informado.
+    """
+    # Normalize dates, the last entry for each key wins
+    rows = {
+        (d.index, d.reference_date): d
+        for d in (
+            d.model_copy(
+                update=dict(
+                    reference_date=app_utils.to_last_day_of_the_month(d.reference_date)
+                )
+            )
+            for d in data
         )
+    }
+    objects = list(rows.values())
 
-        if economic_data is not None:
-            for k, v in d.items():
-                setattr(economic_data, k, v)
-        else:
-            economic_data = EconomicData(**d)
+    # Single multi-row upsert
+    utils.upsert(session, EconomicData, [d.model_dump() for d in objects])
 
-        session.add(economic_data)
-        objects.append(economic_data)
+    # Notify
+    dispatcher.notify_economics_add(objects)
 
-    # Save all transactions
+    # Commit
     session.commit()
 
-    # Notify
-    for obj in objects:
-        dispatcher.notify_economic_add(obj)
-
     return objects
 
 
@@ -467,11 +608,12 @@ def delete_economic_data(
     # Delete
     session.delete(economic)
 
+    # Notify
+    dispatcher.notify_economic_delete(economic)
+
     # Commit
     session.commit()
 
-    # Notify
-    dispatcher.notify_economic_delete(economic)
     return Response(status_code=200)
 
 
@@ -486,20 +628,151 @@ def index_economic_data(
 
 
 @economic.get("/list")
-def list_economic_data(session=RequiresSession) -> list[EconomicSchemaV1]:
-    """Retorna todos os dados econômicos cadastrados."""
-    return list(session.query(EconomicData).all())
+def list_economic_data(
+    index: Annotated[list[EconomicIndex], Query()] = None,
+    start: date = None,
+    end: date = None,
+    order: Literal["asc", "desc"] = "asc",
+    cursor: str = None,
+    limit: PageLimit = 100,
+    accept: Annotated[str, Header()] = None,
+    session=RequiresSession,
+    cache=utils.revalidate(EconomicData.__tablename__),
+) -> PageSchemaV1[EconomicSchemaV1]:
+    """Retorna uma página dos dados econômicos cadastrados, ordenados pela
+    data de referência. Opcionalmente, filtra pelos índices e intervalo de
+    datas de referência (`start` e `end`, inclusivos).
+
+    A próxima página é obtida informando o `next_cursor` da resposta como
+    `cursor`, mantendo os demais parâmetros. Com `Accept` igual a
+    `application/x-ndjson` ou `application/vnd.apache.arrow.stream`, todos os
+    registros (a partir de `cursor`) são enviados em streaming.
+    """
+    query = sa.select(EconomicData)
+    if index is not None:
+        query = query.where(EconomicData.index.in_(index))
+    query = utils.where_between(query, EconomicData.reference_date, start, end)
+
+    keys = [EconomicData.reference_date, EconomicData.index]
+    return utils.paginate(
+        session, query, keys, order, cursor, limit, EconomicSchemaV1, accept, cache
+    )
 
 
 @position.get("/on/{reference_date}")
-def position_on_date(reference_date: date, session=RequiresSession) -> list[Position]:
-    """Retorna a posição de investimentos em uma data."""
-    return Position.get(session, reference_date)
+def position_on_date(
+    reference_date: date,
+    b3_code: Annotated[list[str], Query()] = None,
+    asset_kind: Annotated[list[AssetKind], Query()] = None,
+    orient: Literal["records", "columns"] = "records",
+    session=RequiresSession,
+) -> list[Position]:
+    """Retorna a posição de investimentos em uma data. Opcionalmente,
+    filtra pelos ativos (`b3_code`) e tipos de ativos (`asset_kind`)
+    informados.
+
+    Com `orient=columns`, retorna um objeto com uma lista de
+    valores por campo da posição.
+    """
+
+    def compute():
+        positions = Position.get(
+            session, reference_date, b3_code, asset_kind, as_frame=True
+        )
+        if orient == "columns":
+            return positions.to_dict()
+        return list(positions)
+
+    # Filters are normalized so that equivalent queries share entries,
+    #   which are bound to the wallet version (shared by all workers
+    #   and bumped by writes from any process, e.g. market prices)
+    key = (
+        WalletVersion.get(session, POSITION_TABLES),
+        orient,
+        tuple(sorted(set(b3_code))) if b3_code is not None else None,
+        tuple(sorted(set(asset_kind))) if asset_kind is not None else None,
+    )
+    result = POSITION_CACHE.get_or_compute(reference_date, key, compute)
+    if orient == "columns":
+        return JSONResponse(result)
+    return result
+
+
+@position.get("/history")
+def position_history(
+    start: date,
+    end: date = None,
+    freq: Literal["D", "W", "M"] = "M",
+    b3_code: Annotated[list[str], Query()] = None,
+    asset_kind: Annotated[list[AssetKind], Query()] = None,
+    orient: Literal["records", "columns"] = "records",
+    session=RequiresSession,
+) -> list[PositionHistorySchemaV1]:
+    """Retorna o histórico da posição de investimentos entre `start` e
+    `end` (default=hoje), em datas diárias (`D`), semanais (`W`) ou de
+    final de mês (`M`). A data `end` é sempre incluída.
+
+    Com `orient=columns`, as posições de cada data são retornadas
+    como um objeto com uma lista de valores por campo.
+    """
+    if end is None:
+        end = date.today()
+
+    if start > end:
+        raise HTTPException(status_code=400, detail="Start must be before end.")
+
+    # Reference dates
+    dates = pd.date_range(start, end, freq=dict(D="D", W="W", M="ME")[freq])
+    dates = [d.date() for d in dates] + [end]
+
+    series = Position.get_series(session, dates, b3_code, asset_kind, as_frame=True)
+    if orient == "columns":
+        return JSONResponse(
+            [
+                dict(reference_date=d.isoformat(), positions=p.to_dict())
+                for d, p in series.items()
+            ]
+        )
+
+    return [
+        PositionHistorySchemaV1(reference_date=d, positions=list(p))
+        for d, p in series.items()
+    ]
 
 
 @document.get("/list")
-def list_asset_documents(session=RequiresSession) -> list[AssetDocumentSchemaV1]:
-    return list(session.query(AssetDocument).all())
+def list_asset_documents(
+    asset_b3_code: str = None,
+    start: date = None,
+    end: date = None,
+    sort_by: Literal["id", "publish_date"] = "id",
+    order: Literal["asc", "desc"] = "asc",
+    cursor: str = None,
+    limit: PageLimit = 100,
+    accept: Annotated[str, Header()] = None,
+    session=RequiresSession,
+    cache=utils.revalidate(AssetDocument.__tablename__),
+) -> PageSchemaV1[AssetDocumentSchemaV1]:
+    """Retorna uma página dos documentos cadastrados. Opcionalmente, filtra
+    pelo ativo e intervalo de datas de publicação (`start` e `end`,
+    inclusivos).
+
+    A próxima página é obtida informando o `next_cursor` da resposta como
+    `cursor`, mantendo os demais parâmetros. Com `Accept` igual a
+    `application/x-ndjson` ou `application/vnd.apache.arrow.stream`, todos os
+    registros (a partir de `cursor`) são enviados em streaming.
+    """
+    query = sa.select(AssetDocument)
+    if asset_b3_code is not None:
+        query = query.where(AssetDocument.asset_b3_code == asset_b3_code)
+    query = utils.where_between(query, AssetDocument.publish_date, start, end)
+
+    keys = [AssetDocument.id]
+    if sort_by == "publish_date":
+        keys.insert(0, AssetDocument.publish_date)
+    return utils.paginate(
+        session, query, keys, order, cursor, limit, AssetDocumentSchemaV1, accept, cache
+    )
 
 
 @document.post("/add")
@@ -1,15 +1,19 @@
 """Modelos de retorno com pydantic."""
 
 from datetime import date
+from typing import Generic, TypeVar
 
 from invest_earning.database.wallet import (
     AssetKind,
     EarningKind,
     EconomicIndex,
+    Position,
     TransactionKind,
 )
 from pydantic import BaseModel, ConfigDict
 
+T = TypeVar("T")
+
 
 class AssetSchemaV1(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -31,6 +35,15 @@ class EarningSchemaV1(BaseModel):
     kind: EarningKind
 
 
+class EarningCreateSchemaV1(BaseModel):
+    asset_b3_code: str
+    hold_date: date
+    payment_date: date
+    value_per_share: float
+    ir_percentage: float
+    kind: EarningKind
+
+
 class TransactionSchemaV1(BaseModel):
     model_config = ConfigDict(from_attributes=True)
     id: int
@@ -41,6 +54,14 @@ class TransactionSchemaV1(BaseModel):
     shares: int
 
 
+class TransactionCreateSchemaV1(BaseModel):
+    asset_b3_code: str
+    date: date
+    kind: TransactionKind
+    value_per_share: float
+    shares: int
+
+
 class EconomicSchemaV1(BaseModel):
     model_config = ConfigDict(from_attributes=True)
     index: EconomicIndex
@@ -54,3 +75,13 @@ class AssetDocumentSchemaV1(BaseModel):
     title: str
     publish_date: date
     url: str
+
+
+class PositionHistorySchemaV1(BaseModel):
+    reference_date: date
+    positions: list[Position]
+
+
+class PageSchemaV1(BaseModel, Generic[T]):
+    data: list[T]
+    next_cursor: str | None = None
@@ -0,0 +1,139 @@
+"""Respostas em streaming para
+listagens (NDJSON e Arrow).
+"""
+
+import io
+import json
+from datetime import date
+from enum import Enum
+from typing import Callable, Iterator
+
+import pyarrow as pa
+import sqlalchemy as sa
+from app.config import STREAM_CONFIG
+from app.db import engine
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+NDJSON = "application/x-ndjson"
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+
+_ARROW_TYPES = {
+    int: pa.int64(),
+    float: pa.float64(),
+    str: pa.string(),
+    date: pa.date32(),
+}
+_CONVERTERS = {
+    Enum: lambda v: v.value,
+    float: lambda v: None if v is None else float(v),
+}
+
+
+def negotiate(accept: str | None) -> str | None:
+    """Retorna o formato de streaming solicitado no
+    cabeçalho `Accept` (NDJSON ou Arrow IPC stream),
+    ou `None` caso nenhum seja aceito.
+    """
+    for media_type in (accept or "").split(","):
+        media_type = media_type.split(";")[0].strip()
+        if media_type in (NDJSON, ARROW_STREAM):
+            return media_type
+    return None
+
+
+def stream(
+    query: sa.Select,
+    schema: type[BaseModel],
+    media_type: str,
+    headers: dict[str, str] = None,
+) -> StreamingResponse:
+    """Envia os registros da consulta em streaming.
+
+    Somente as colunas dos campos de `schema` são lidas,
+    em lotes através de um cursor do lado do servidor,
+    sem construção de objetos do ORM.
+
+    Args:
+        query: consulta ordenada sobre uma entidade.
+        schema: modelo com os campos a serem enviados.
+        media_type: formato de saída.
+        headers: cabeçalhos adicionais da resposta.
+    """
+    entity = query.column_descriptions[0]["entity"]
+    names = list(schema.model_fields)
+    query = query.with_only_columns(*[getattr(entity, n) for n in names])
+
+    # Enums are sent by value and numerics (possibly
+    #   decimals) as floats
+    types = [f.annotation for f in schema.model_fields.values()]
+    converters = {
+        i: _CONVERTERS[Enum if issubclass(t, Enum) else t]
+        for i, t in enumerate(types)
+        if issubclass(t, Enum) or t in _CONVERTERS
+    }
+
+    if media_type == ARROW_STREAM:
+        arrow_schema = pa.schema(
+            [
+                (n, pa.string() if issubclass(t, Enum) else _ARROW_TYPES[t])
+                for n, t in zip(names, types)
+            ]
+        )
+        content = _arrow_stream(query, arrow_schema, converters)
+    else:
+        content = _ndjson(query, names, converters)
+
+    return StreamingResponse(content, media_type=media_type, headers=headers)
+
+
+def _ndjson(
+    query: sa.Select, names: list[str], converters: dict[int, Callable]
+) -> Iterator[bytes]:
+    for columns in _batches(query, converters):
+        yield "".join(
+            json.dumps(dict(zip(names, row)), default=date.isoformat) + "\n"
+            for row in zip(*columns)
+        ).encode()
+
+
+def _arrow_stream(
+    query: sa.Select, schema: pa.Schema, converters: dict[int, Callable]
+) -> Iterator[bytes]:
+    sink = io.BytesIO()
+
+    def flush() -> bytes:
+        data = sink.getvalue()
+        sink.seek(0)
+        sink.truncate()
+        return data
+
+    with pa.ipc.new_stream(sink, schema) as writer:
+        # The schema is sent before querying the database
+        yield flush()
+
+        for columns in _batches(query, converters):
+            writer.write_batch(
+                pa.record_batch(
+                    [pa.array(c, type=t) for c, t in zip(columns, schema.types)],
+                    schema=schema,
+                )
+            )
+            yield flush()
+
+    # End-of-stream marker
+    yield flush()
+
+
+def _batches(query: sa.Select, converters: dict[int, Callable]) -> Iterator[list[list]]:
+    # The response outlives the request session, thus rows
+    #   are read with a dedicated connection (without the ORM)
+    with engine.connect() as conn:
+        result = conn.execute(
+            query.execution_options(yield_per=STREAM_CONFIG.stream_batch_size)
+        )
+        for rows in result.partitions():
+            columns = [list(c) for c in zip(*rows)]
+            for i, fn in converters.items():
+                columns[i] = [fn(v) for v in columns[i]]
+            yield columns
@@ -1,30 +1,219 @@
 """Utilidades para a API."""
 
+import base64
+import json
+import logging
+from datetime import date
+from enum import Enum
+from typing import Annotated, Iterable, Literal
+
 import sqlalchemy as sa
-from invest_earning.database.wallet import Earning, Transaction
+from app.db import RequiresSession
+from fastapi import Depends, Header, HTTPException, Response
+from fastapi.responses import StreamingResponse
+from invest_earning.database.wallet import Asset, ShareLedger, WalletVersion
+from pydantic import BaseModel
+
+from . import streaming
+
+logger = logging.getLogger(__name__)
+
+
+def check_assets_exist(session: sa.orm.Session, b3_codes: set[str]):
+    """Garante que todos os ativos existem, caso contrário
+    retorna um erro listando os ativos inexistentes.
+    """
+    existing = set(
+        session.scalars(sa.select(Asset.b3_code).where(Asset.b3_code.in_(b3_codes)))
+    )
+    missing = sorted(b3_codes - existing)
+    if missing:
+        raise HTTPException(
+            status_code=400, detail=f"Assets not found: {', '.join(missing)}."
+        )
 
 
-def update_earning_rights(
+def upsert(
     session: sa.orm.Session,
-    earning: Earning = None,
-    transaction: Transaction = None,
+    entity: type,
+    rows: list[dict],
+    chunk_size: int = 5000,
 ):
-    assert (earning is not None) or (transaction is not None)
-
-    # Add to new earning
-    if earning:
-        earning.right_to_earnings = list(
-            session.query(Transaction)
-            .where(Transaction.asset_b3_code == earning.asset_b3_code)
-            .where(Transaction.date <= earning.hold_date)
-            .all()
+    """Insere ou atualiza (pela chave primária) registros
+    em bulk, com `INSERT ... ON CONFLICT DO UPDATE` de
+    múltiplas linhas.
+
+    Somente as colunas presentes nos registros são
+    atualizadas. Os registros devem possuir chaves
+    primárias distintas.
+    """
+    if not rows:
+        return
+
+    # Select dialect-specific INSERT with ON CONFLICT support
+    match session.get_bind().dialect.name:
+        case "postgresql":
+            insert = sa.dialects.postgresql.insert
+        case "sqlite":
+            insert = sa.dialects.sqlite.insert
+        case dialect:
+            insert = None
+
+    # Fallback to ORM for other dialects
+    if insert is None:
+        logger.warning(
+            "Dialect '%s' has no bulk upsert support, falling back to ORM merges.",
+            dialect,
+        )
+        for data in rows:
+            session.merge(entity(**data))
+        return
+
+    primary_key = [c.name for c in entity.__table__.primary_key]
+    for i in range(0, len(rows), chunk_size):
+        stmt = insert(entity).values(rows[i : i + chunk_size])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=primary_key,
+            set_={k: stmt.excluded[k] for k in rows[0] if k not in primary_key},
         )
+        session.execute(stmt)
+
+
+def update_share_ledger(session: sa.orm.Session, b3_codes: Iterable[str]):
+    """Recalcula o livro de unidades dos ativos cujas
+    transações foram alteradas.
+    """
+    # Pending transactions must be visible to the statements
+    session.flush()
+    ShareLedger.rebuild(session, set(b3_codes))
+
+
+def revalidate(*tables: str):
+    """Dependência para GETs condicionais sobre as
+    tabelas informadas.
+
+    O `ETag` é derivado da versão das tabelas, de forma
+    que requisições com `If-None-Match` correspondente
+    são respondidas com `304` sem consultar os dados.
+
+    Returns:
+        cabeçalhos de cache da resposta (`ETag` e `Vary`).
+    """
+
+    def dependency(
+        response: Response,
+        if_none_match: Annotated[str, Header()] = None,
+        accept: Annotated[str, Header()] = None,
+        session=RequiresSession,
+    ) -> dict[str, str]:
+        tag = str(WalletVersion.get(session, list(tables)))
+
+        # Streaming representations have their own tags
+        if (media_type := streaming.negotiate(accept)) is not None:
+            tag = f"{tag}-{media_type.split('/')[-1]}"
+
+        etag = f'W/"{tag}"'
+        headers = {"ETag": etag, "Vary": "Accept"}
+        if if_none_match is not None and _etag_matches(if_none_match, etag):
+            raise HTTPException(status_code=304, headers=headers)
 
-    # Add to new transaction
-    if transaction:
-        transaction.entitled_to_earnings = list(
-            session.query(Earning)
-            .where(Earning.asset_b3_code == transaction.asset_b3_code)
-            .where(Earning.hold_date >= transaction.date)
-            .all()
+        response.headers.update(headers)
+        return headers
+
+    return Depends(dependency)
+
+
+def where_between(
+    query: sa.Select, column: sa.ColumnElement, start: date = None, end: date = None
+) -> sa.Select:
+    """Filtra uma consulta pelo intervalo fechado
+    `[start, end]`. Limites `null` são ignorados.
+    """
+    if start is not None:
+        query = query.where(column >= start)
+    if end is not None:
+        query = query.where(column <= end)
+    return query
+
+
+def paginate(
+    session: sa.orm.Session,
+    query: sa.Select,
+    keys: list[sa.orm.InstrumentedAttribute],
+    order: Literal["asc", "desc"],
+    cursor: str | None,
+    limit: int,
+    schema: type[BaseModel] = None,
+    accept: str | None = None,
+    headers: dict[str, str] = None,
+) -> dict | StreamingResponse:
+    """Pagina uma consulta através de keyset.
+
+    A consulta é ordenada pelas colunas `keys`, que devem
+    identificar unicamente cada registro. O cursor codifica
+    os valores dessas colunas para o último registro da
+    página, de forma que a próxima página é obtida sem
+    `OFFSET`.
+
+    Caso o cabeçalho `Accept` solicite um formato de
+    streaming (ver `streaming.negotiate`), todos os
+    registros a partir do cursor são enviados nesse
+    formato, com os campos de `schema` e cabeçalhos
+    `headers`.
+
+    Returns:
+        dict: registros da página (`data`) e cursor para
+            a próxima página (`next_cursor`), que é `null`
+            na última página.
+    """
+    if cursor is not None:
+        lhs = sa.tuple_(*keys)
+        rhs = sa.tuple_(
+            *[sa.literal(v, k.type) for k, v in zip(keys, _decode_cursor(cursor, keys))]
         )
+        query = query.where(lhs < rhs if order == "desc" else lhs > rhs)
+    query = query.order_by(*[k.desc() if order == "desc" else k for k in keys])
+
+    if (media_type := streaming.negotiate(accept)) is not None:
+        return streaming.stream(query, schema, media_type, headers)
+
+    # An additional row tells whether there is a next page
+    data = session.scalars(query.limit(limit + 1)).all()
+
+    next_cursor = None
+    if len(data) > limit:
+        data = data[:limit]
+        next_cursor = _encode_cursor([getattr(data[-1], k.key) for k in keys])
+
+    return dict(data=data, next_cursor=next_cursor)
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    # Weak comparison (RFC 9110)
+    tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+
+def _encode_cursor(values: list) -> str:
+    data = json.dumps(
+        values, default=lambda v: v.value if isinstance(v, Enum) else v.isoformat()
+    )
+    return base64.urlsafe_b64encode(data.encode()).decode()
+
+
+def _decode_cursor(cursor: str, keys: list[sa.orm.InstrumentedAttribute]) -> list:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        assert isinstance(values, list) and len(values) == len(keys)
+
+        # Restore the types of the keys
+        return [
+            (
+                date.fromisoformat(v)
+                if k.type.python_type is date
+                else k.type.python_type(v)
+            )
+            for k, v in zip(keys, values)
+        ]
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
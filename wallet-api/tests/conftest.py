@@ -0,0 +1,24 @@
+import os
+import tempfile
+
+import pytest
+
+# The API engine is created on import, thus the database
+#   must be configured beforehand
+_DB_DIR = tempfile.TemporaryDirectory()
+os.environ["DB_URL"] = f"sqlite:///{_DB_DIR.name}/wallet.db"
+
+
+@pytest.fixture
+def client():
+    from app.api import app
+    from app.db import engine
+    from fastapi.testclient import TestClient
+    from invest_earning.database.base import WalletBase
+
+    WalletBase.metadata.drop_all(engine)
+    WalletBase.metadata.create_all(engine)
+
+    # Without the lifespan, the outbox relay isn't started
+    #   and notifications stay in the outbox
+    return TestClient(app)
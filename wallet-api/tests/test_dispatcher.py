@@ -0,0 +1,43 @@
+import re
+
+import sqlalchemy as sa
+from app.db import engine
+from invest_earning.database.wallet import NotificationOutbox
+
+_EARNING = dict(
+    asset_b3_code="ABCD11",
+    hold_date="2024-01-31",
+    payment_date="2024-02-15",
+    kind="Dividendo",
+    value_per_share=0.5,
+    ir_percentage=0.0,
+)
+
+
+def _outbox() -> list[str]:
+    with sa.orm.Session(engine) as session:
+        return list(
+            session.scalars(
+                sa.select(NotificationOutbox.body).order_by(NotificationOutbox.id)
+            )
+        )
+
+
+def _ids(body: str, entity: str) -> list[int]:
+    match = re.match(rf"\[wallet-api\] CREATED {entity} WITH ID ([\w,]+) ", body)
+    assert match is not None, body
+    return [int(i) for i in match.group(1).split(",")]
+
+
+def test_outbox_holds_ids_of_created_earnings(client):
+    client.post(
+        "/v1/asset/create",
+        json=dict(b3_code="ABCD11", name="ABCD", kind="FII"),
+    ).raise_for_status()
+
+    created = client.post("/v1/earnings/create", json=_EARNING).json()
+    bulk = client.post("/v1/earnings/bulk", json=dict(data=[_EARNING] * 3)).json()
+
+    single, batch = _outbox()[-2:]
+    assert _ids(single, "earning") == [created["id"]]
+    assert sorted(_ids(batch, "earning")) == sorted(e["id"] for e in bulk)
@@ -0,0 +1,46 @@
+from datetime import date
+
+import sqlalchemy as sa
+from app.db import engine
+from invest_earning.database.wallet import MarketPrice
+
+
+def _set_price(price: float):
+    # Written by another process (e.g., market price scraper)
+    with sa.orm.Session(engine) as session:
+        session.merge(
+            MarketPrice(
+                reference_date=date(2024, 1, 31),
+                asset_b3_code="ABCD11",
+                closing_price=price,
+            )
+        )
+        session.commit()
+
+
+def test_position_reflects_writes_from_other_processes(client):
+    client.post(
+        "/v1/asset/create",
+        json=dict(b3_code="ABCD11", name="ABCD", kind="FII"),
+    ).raise_for_status()
+    client.post(
+        "/v1/transactions/create",
+        json=dict(
+            asset_b3_code="ABCD11",
+            date="2024-01-02",
+            kind="Compra",
+            value_per_share=10.0,
+            shares=10,
+        ),
+    ).raise_for_status()
+
+    def current_price() -> float:
+        (position,) = client.get("/v1/position/on/2024-01-31").json()
+        return position["current_price"]
+
+    _set_price(11.0)
+    assert current_price() == 11.0
+    assert current_price() == 11.0
+
+    _set_price(12.0)
+    assert current_price() == 12.0